@@ -1,9 +1,14 @@
+import asyncio
 import json
 import os
+import re
 import tempfile
+import warnings
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Optional, List
+from unittest.mock import patch
 
+import numpy as np
 import pytest
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import ChatMessage, AIMessage
@@ -12,10 +17,23 @@ from langchain_core.runnables import Runnable
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 
-from tickermood.agent import invoke_summarize_agent
+from tickermood.agent import (
+    collapse_summaries,
+    invoke_summarize_agent,
+    invoke_structured,
+    ainvoke_summarize_agent,
+    set_llm_semaphore,
+    merge_price_targets,
+    price_target,
+)
 from tickermood.articles import News, PriceTargetNews
-from tickermood.main import get_news
-from tickermood.subject import LLMSubject, Subject, LLM
+from tickermood.compression import compress_text, textrank, tfidf_matrix
+from tickermood.database.crud import TickerMoodDb
+from typer.testing import CliRunner
+
+from tickermood.main import app, get_news, TickerMoodNews, TickerMood
+from tickermood.subject import LLMSubject, Subject, LLM, PriceTarget
+from tickermood.tokens import split_text, group_texts, count_tokens
 from tickermood.types import DatabaseConfig
 
 
@@ -72,6 +90,26 @@ class FakeLLM(BaseChatModel):
         return SimpleRunnable()
 
 
+class FakeJsonLLM(FakeLLM):
+    def _generate(
+        self,
+        messages: List[ChatMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+    ) -> ChatResult:
+        content = json.dumps(
+            {
+                "high_price_target": 200.0,
+                "low_price_target": 100.0,
+                "consensus": "Buy",
+                "reason": "Analysts are optimistic.",
+                "recommendation": "Hold",
+                "explanation": "News is mixed.",
+            }
+        )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content))])
+
+
 def test_summarize_agent():
     subject = LLMSubject(
         symbol="fake",
@@ -184,3 +222,419 @@ def test_get_news() -> None:
         database_path=Path.cwd() / "tickermood_get_news.db"
     )
     get_news(symbols, database_config, headless=False)
+
+
+def test_next_article_cursor() -> None:
+    news = [
+        News(source="Investing", content="article", url=f"http://example.com/{i}")
+        for i in range(3)
+    ]
+    subject = LLMSubject(
+        symbol="fake", model_type=FakeLLM, model_name="Fake LLM", news=news
+    )
+    subject.add_news_summary("summary", news[1])
+    assert subject.get_next_article() == news[0]
+    subject.add_news_summary("summary", news[0])
+    subject = LLMSubject.model_validate(subject.model_dump())
+    assert subject.get_next_article() == news[2]
+    subject.add_news_summary("summary", news[2])
+    assert subject.get_next_article() is None
+    assert subject.pending_news == [0, 2]
+    assert subject.pending_index == 2
+
+
+def test_split_text() -> None:
+    text = " ".join(f"Sentence number {i} about the stock." for i in range(200))
+    chunks = split_text(text, 100, "qwen3:4b")
+    assert len(chunks) > 1
+    assert all(count_tokens(c, "qwen3:4b") <= 100 for c in chunks)
+    assert split_text("Short text.", 100, "qwen3:4b") == ["Short text."]
+    groups = group_texts(chunks, 100, "qwen3:4b")
+    assert all(len(g) > 1 for g in groups)
+    assert sum(len(g) for g in groups) == len(chunks)
+
+
+def test_compress_text() -> None:
+    filler = " ".join(f"Markets moved on day {i} without news." for i in range(100))
+    text = f"Palantir raised its revenue guidance. {filler} PLTR shares rallied."
+    compressed = compress_text(text, 50, "qwen3:4b", ["pltr", "palantir"])
+    assert count_tokens(compressed, "qwen3:4b") <= 50
+    assert compressed.startswith("Palantir raised its revenue guidance.")
+    assert compressed.endswith("PLTR shares rallied.")
+    assert compress_text("Short text.", 50, "qwen3:4b", []) == "Short text."
+
+
+def test_textrank_isolated_sentences() -> None:
+    weights = tfidf_matrix([["palantir", "revenue"], ["oil", "prices"], ["oil"]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        scores = textrank(weights)
+    assert np.isfinite(scores).all()
+    assert scores[0] < scores[1]
+
+
+def test_summarize_agent_packed_articles() -> None:
+    calls = []
+
+    class PackingLLM(FakeLLM):
+        def _generate(
+            self,
+            messages: List[ChatMessage],
+            stop: Optional[List[str]] = None,
+            run_manager: Optional[Any] = None,
+        ) -> ChatResult:
+            urls = re.findall(r"URL: (\S+)", str(messages[-1].content))
+            calls.append(urls)
+            content = json.dumps(
+                {"summaries": [{"url": u, "summary": f"about {u}"} for u in urls[1:]]}
+            )
+            message = AIMessage(content=content if urls else "single summary")
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=PackingLLM,
+        model_name="Fake LLM",
+        pack_tokens=100,
+        news=[
+            News(source="Investing", content="Short blurb.", url=f"http://e.com/{i}")
+            for i in range(5)
+        ],
+    )
+    result_subject = invoke_summarize_agent(subject)
+    summaries = {s.url: s.content for s in result_subject.news_summary}
+    assert len(summaries) == 5
+    packed_urls = next(urls for urls in calls if urls)
+    assert len(packed_urls) == 5
+    assert summaries[packed_urls[0]] == "single summary"
+    assert summaries[packed_urls[1]] == f"about {packed_urls[1]}"
+
+
+def test_summarize_agent_long_articles() -> None:
+    content = " ".join(f"Sentence number {i} about the stock." for i in range(500))
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=FakeLLM,
+        model_name="Fake LLM",
+        max_input_tokens=100,
+        news=[
+            News(source="Investing", content=content, url=f"http://example.com/{i}")
+            for i in range(30)
+        ],
+    )
+    result_subject = invoke_summarize_agent(subject)
+    assert len(result_subject.news_summary) == 30
+    assert result_subject.summary
+
+
+def test_summarize_agent_analysis() -> None:
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=FakeJsonLLM,
+        model_name="Fake LLM",
+        price_target_news=[
+            PriceTargetNews(source="Investing", content="Targets 100 to 200.")
+        ],
+        news=[
+            News(source="Investing", content="article", url=f"http://example.com/{i}")
+            for i in range(3)
+        ],
+    )
+    result_subject = invoke_summarize_agent(subject)
+    assert len(result_subject.news_summary) == 3
+    assert result_subject.summary
+    assert result_subject.high_price_target == 200.0
+    assert result_subject.low_price_target == 100.0
+    assert result_subject.consensus == "Buy"
+    assert result_subject.recommendation == "Hold"
+
+
+def test_structured_price_target() -> None:
+    yahoo = PriceTargetNews(
+        source="Yahoo",
+        content="{}",
+        high_price_target=250.0,
+        low_price_target=90.0,
+        fair_value=180.0,
+    )
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=FakeLLM,
+        model_name="Fake LLM",
+        price_target_news=[yahoo],
+    )
+    with patch.object(FakeLLM, "_generate", side_effect=AssertionError):
+        result = price_target(subject)
+    assert result["high_price_target"] == 250.0
+    assert result["low_price_target"] == 90.0
+    assert result["fair_value"] == 180.0
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=FakeJsonLLM,
+        model_name="Fake LLM",
+        price_target_news=[
+            yahoo,
+            PriceTargetNews(source="Investing", content="Targets 100 to 200."),
+        ],
+    )
+    assert subject.combined_price_target_news() == "Targets 100 to 200."
+    result = price_target(subject)
+    assert result["high_price_target"] == 250.0
+    assert result["low_price_target"] == 90.0
+
+
+def test_merge_price_targets_prefers_structured() -> None:
+    structured = PriceTarget(high_price_target=250.0, low_price_target=0.0)
+    llm_target = PriceTarget(
+        high_price_target=400.0, low_price_target=10.0, fair_value=180.0
+    )
+    merged = merge_price_targets(llm_target, structured)
+    assert merged.high_price_target == 250.0
+    assert merged.low_price_target == 0.0
+    assert merged.fair_value == 180.0
+    assert merge_price_targets(llm_target, None) == llm_target
+
+
+def test_invoke_structured_retry() -> None:
+    responses = ["<think>hmm</think> not json", '{"high_price_target": 150}']
+
+    class FlakyLLM(FakeLLM):
+        def _generate(
+            self, messages: List[ChatMessage], stop: Optional[List[str]] = None
+        ) -> ChatResult:
+            message = AIMessage(content=responses.pop(0))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    price_target = invoke_structured(FlakyLLM(model="fake"), [], PriceTarget)
+    assert price_target.high_price_target == 150
+    assert not responses
+
+
+def test_summarize_agent_async() -> None:
+    subject = LLMSubject(
+        symbol="fake",
+        model_type=FakeJsonLLM,
+        model_name="Fake LLM",
+        price_target_news=[
+            PriceTargetNews(source="Investing", content="Targets 100 to 200.")
+        ],
+        news=[
+            News(source="Investing", content="article", url=f"http://example.com/{i}")
+            for i in range(3)
+        ],
+    )
+
+    async def run() -> List[Subject]:
+        set_llm_semaphore(1)
+        return await asyncio.gather(
+            *(ainvoke_summarize_agent(subject.model_copy(deep=True)) for _ in range(3))
+        )
+
+    expected = invoke_summarize_agent(subject.model_copy(deep=True))
+    for result_subject in asyncio.run(run()):
+        assert result_subject.model_dump(exclude={"date"}) == expected.model_dump(
+            exclude={"date"}
+        )
+
+
+def test_llm_usage_report() -> None:
+    subject = Subject(
+        symbol="fake",
+        price_target_news=[
+            PriceTargetNews(source="Investing", content="Targets 100 to 200.")
+        ],
+        news=[
+            News(source="Investing", content="article", url=f"http://example.com/{i}")
+            for i in range(3)
+        ],
+    )
+    llm = LLM(model_type=FakeJsonLLM, model_name="Fake LLM", skip_validation=True)
+    with tempfile.NamedTemporaryFile(suffix=".db") as f:
+        database_config = DatabaseConfig(database_path=Path(f.name))
+        ticker_mood = TickerMoodNews(subjects=[subject])
+        ticker_mood.set_database(database_config)
+        ticker_mood.summarize(subject, llm)
+        usage = {
+            u.node: u
+            for u in TickerMoodDb(database_path=Path(f.name)).usage_report(["fake"])
+        }
+        assert set(usage) == {"summarize", "reduce", "price_target", "get_analysis"}
+        assert usage["summarize"].calls == 3
+        assert all(u.latency > 0 for u in usage.values())
+
+
+interrupted_calls: List[str] = []
+
+
+class InterruptedLLM(FakeJsonLLM):
+    def _generate(
+        self,
+        messages: List[ChatMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[Any] = None,
+    ) -> ChatResult:
+        content = str(messages[-1].content)
+        interrupted_calls.append(content)
+        if "second article" in content and "interrupt" in interrupted_calls:
+            raise RuntimeError("Ollama restarted")
+        return super()._generate(messages, stop, run_manager)
+
+
+def test_resume_from_checkpoint() -> None:
+    subject = Subject(
+        symbol="fake",
+        news=[
+            News(source="Investing", content="first article", url="http://a.com/1"),
+            News(source="Investing", content="second article", url="http://a.com/2"),
+        ],
+    )
+    llm = LLM(model_type=InterruptedLLM, model_name="Fake LLM", skip_validation=True)
+    with tempfile.TemporaryDirectory() as folder:
+        database_config = DatabaseConfig(database_path=Path(folder) / "test.db")
+        interrupted_calls[:] = ["interrupt"]
+        ticker_mood = TickerMood(
+            subjects=[subject], llm=llm, database_config=database_config
+        )
+        ticker_mood.checkpoint = True
+        with pytest.raises(RuntimeError):
+            ticker_mood.call_agent()
+        assert ticker_mood.resumable_symbols() == {"fake"}
+
+        interrupted_calls[:] = []
+        resumed = TickerMood(
+            subjects=[Subject(symbol="fake")], llm=llm, database_config=database_config
+        )
+        resumed.resume(ticker_mood.run_id)
+        resumed.call_agent()
+        assert not any("first article" in c for c in interrupted_calls)
+        loaded_subject = Subject(symbol="fake").load(database_config)
+        assert len(loaded_subject.news_summary) == 2
+        assert loaded_subject.consensus == "Buy"
+        assert not resumed.resumable_symbols()
+
+
+def test_async_agent_keeps_other_subjects_on_failure() -> None:
+    llm = LLM(model_type=InterruptedLLM, model_name="Fake LLM", skip_validation=True)
+    subjects = [
+        Subject(
+            symbol=symbol,
+            news=[News(source="Investing", content=content, url="http://a.com/1")],
+        )
+        for symbol, content in [("good", "first article"), ("bad", "second article")]
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        database_config = DatabaseConfig(database_path=Path(folder) / "test.db")
+        interrupted_calls[:] = ["interrupt"]
+        ticker_mood = TickerMood(
+            subjects=subjects, llm=llm, database_config=database_config
+        )
+        with ticker_mood.database_writer():
+            asyncio.run(ticker_mood.acall_agent())
+        assert Subject(symbol="good").load(database_config).consensus == "Buy"
+        with pytest.raises(ValueError):
+            Subject(symbol="bad").load(database_config)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["AAPL", "NVDA"], ["run", "AAPL", "NVDA"], ["AAPL", "NVDA", "--headless"]],
+)
+def test_cli_run_is_default_command(
+    args: List[str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    runs = []
+    monkeypatch.setattr(
+        TickerMood, "run", lambda self: runs.append([s.symbol for s in self.subjects])
+    )
+    monkeypatch.setattr("tickermood.subject.check_ollama_model", lambda name: True)
+    with tempfile.TemporaryDirectory() as folder:
+        result = CliRunner().invoke(
+            app, [*args, "--path", str(Path(folder) / "test.db")]
+        )
+    assert result.exit_code == 0, result.output
+    assert runs == [["AAPL", "NVDA"]]
+
+
+def test_resume_skips_completed_subjects() -> None:
+    llm = LLM(model_type=InterruptedLLM, model_name="Fake LLM", skip_validation=True)
+    subjects = [
+        Subject(
+            symbol=symbol,
+            news=[News(source="Investing", content=content, url="http://a.com/1")],
+        )
+        for symbol, content in [("done", "first article"), ("todo", "second article")]
+    ]
+    with tempfile.TemporaryDirectory() as folder:
+        database_config = DatabaseConfig(database_path=Path(folder) / "test.db")
+        interrupted_calls[:] = ["interrupt"]
+        ticker_mood = TickerMood(
+            subjects=subjects, llm=llm, database_config=database_config
+        )
+        ticker_mood.checkpoint = True
+        with pytest.raises(RuntimeError):
+            ticker_mood.call_agent()
+        assert ticker_mood.completed_symbols() == {"done"}
+        assert ticker_mood.resumable_symbols() == {"todo"}
+
+        interrupted_calls[:] = []
+        resumed = TickerMood(
+            subjects=[Subject(symbol="done"), Subject(symbol="todo")],
+            llm=llm,
+            database_config=database_config,
+        )
+        resumed.resume(ticker_mood.run_id)
+        resumed.call_agent()
+        assert [s.symbol for s in resumed.subjects] == ["todo"]
+        assert not any("first article" in c for c in interrupted_calls)
+        assert resumed.completed_symbols() == {"done", "todo"}
+
+
+def test_failed_write_keeps_checkpoint() -> None:
+    llm = LLM(model_type=InterruptedLLM, model_name="Fake LLM", skip_validation=True)
+    subject = Subject(
+        symbol="todo",
+        news=[News(source="Investing", content="an article", url="http://a.com/1")],
+    )
+    with tempfile.TemporaryDirectory() as folder:
+        database_config = DatabaseConfig(database_path=Path(folder) / "test.db")
+        interrupted_calls[:] = []
+        ticker_mood = TickerMood(
+            subjects=[subject], llm=llm, database_config=database_config
+        )
+        ticker_mood.checkpoint = True
+        with patch.object(
+            TickerMoodDb, "write_many", side_effect=RuntimeError("disk full")
+        ):
+            with ticker_mood.database_writer():
+                ticker_mood.call_agent()
+        assert ticker_mood.completed_symbols() == set()
+        assert ticker_mood.resumable_symbols() == {"todo"}
+
+        calls = len(interrupted_calls)
+        resumed = TickerMood(
+            subjects=[Subject(symbol="todo")], llm=llm, database_config=database_config
+        )
+        resumed.resume(ticker_mood.run_id)
+        with resumed.database_writer():
+            resumed.call_agent()
+        assert len(interrupted_calls) == calls
+        assert resumed.completed_symbols() == {"todo"}
+        assert resumed.resumable_symbols() == set()
+        saved = TickerMoodDb(database_path=database_config.database_path).load(
+            Subject(symbol="todo")
+        )
+        assert [n.content for n in saved.news] == ["an article"]
+        assert len(saved.news_summary) == 1
+
+
+def test_collapse_keeps_failed_groups() -> None:
+    subject = LLMSubject(symbol="fake", model_type=FakeLLM, model_name="Fake LLM")
+    groups = [["first", "second"], ["third"]]
+    with patch("tickermood.agent.reduce_groups", side_effect=[groups, []]), patch(
+        "tickermood.agent.batch_llm",
+        return_value=[AIMessage(content="merged"), RuntimeError("timeout")],
+    ):
+        summaries = collapse_summaries(
+            subject.get_model("reduce"), subject, ["first", "second", "third"]
+        )
+    assert summaries == ["merged", "third"]
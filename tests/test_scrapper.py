@@ -1,11 +1,22 @@
 import tempfile
 from pathlib import Path
-from typing import Any
+from typing import Any, List
 from unittest.mock import patch
 
 import pytest
 
-from tickermood.source import Investing, Yahoo, Marketwatch, StockAnalysis
+from tickermood.articles import News
+from tickermood.relevance import RelevanceFilter
+from bs4 import BeautifulSoup
+
+from tickermood.source import (
+    Investing,
+    Yahoo,
+    Marketwatch,
+    StockAnalysis,
+    stock_analysis_price_targets,
+    to_price,
+)
 from tickermood.subject import Subject
 from tickermood.types import DatabaseConfig
 
@@ -131,3 +142,70 @@ def test_stock_analysis() -> None:
     price_target = market_watch.get_price_target_news()
     assert news
     assert price_target
+
+
+def test_relevance_filter() -> None:
+    subject = Subject(symbol="PLTR", name="Palantir Technologies Inc.")
+    relevance = RelevanceFilter.from_subject(subject, threshold=0.25)
+    assert relevance.terms == ["pltr", "palantir", "technologies"]
+    links = [
+        ("https://www.example.com/palantir-earnings", "Palantir beats estimates"),
+        ("https://www.example.com/fed-rates", "Fed holds rates steady"),
+        ("https://www.example.com/pltr-options", "PLTR options volume spikes"),
+    ]
+    assert relevance.filter_links(links) == [links[0][0], links[2][0]]
+    news = [
+        News(url="a", source="Yahoo", content="Palantir (PLTR) raised guidance."),
+        News(url="b", source="Yahoo", content="Oil prices fell on Monday."),
+    ]
+    assert [n.url for n in relevance.filter_news(news)] == ["a"]
+    disabled = RelevanceFilter.from_subject(subject, threshold=0)
+    assert disabled.filter_news(news) == news
+
+
+@pytest.mark.parametrize(
+    "symbol, headlines",
+    [
+        (
+            "PLTR",
+            [
+                "Palantir stock jumps after earnings",
+                "Palantir revenue grows 39% as US commercial sales surge",
+            ],
+        ),
+        ("GOOG", ["Alphabet earnings beat", "Google Cloud backlog hits record"]),
+    ],
+)
+def test_relevance_filter_keeps_headlines_by_default(
+    symbol: str, headlines: List[str]
+) -> None:
+    relevance = RelevanceFilter.from_subject(Subject(symbol=symbol))
+    assert not relevance.enabled
+    links = [(f"https://www.example.com/{i}", h) for i, h in enumerate(headlines)]
+    assert relevance.filter_links(links) == [url for url, _ in links]
+    news = [News(url=url, source="Yahoo", content=h) for url, h in links]
+    assert relevance.filter_news(news) == news
+
+
+def test_stock_analysis_price_targets() -> None:
+    table = BeautifulSoup(
+        """<table>
+        <tr><th>Target</th><th>Low</th><th>Average</th><th>Median</th><th>High</th></tr>
+        <tr><td>Price</td><td>$100</td><td>$180.50</td><td>$185</td><td>$1,250</td></tr>
+        </table>""",
+        "html.parser",
+    )
+    assert stock_analysis_price_targets(table) == {
+        "high_price_target": 1250.0,
+        "low_price_target": 100.0,
+        "fair_value": 180.5,
+    }
+    text = BeautifulSoup(
+        "<p>The 12 analysts have an average target of $180.5, with a low estimate "
+        "of $100 and a high estimate of $250.</p>",
+        "html.parser",
+    )
+    assert stock_analysis_price_targets(text)["high_price_target"] == 250.0
+    assert stock_analysis_price_targets(BeautifulSoup("", "html.parser")) == {}
+    assert to_price(float("nan")) is None
+    assert to_price("n/a") is None
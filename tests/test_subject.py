@@ -1,10 +1,33 @@
+import asyncio
+import json
+import os
+import sqlite3
 import tempfile
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, List
 
+import pandas as pd
 import pytest
+import typer
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from langchain_ollama import ChatOllama
+from ollama import EmbedResponse
 
-from tickermood.main import TickerMood
-from tickermood.subject import Subject
+import tickermood
+from tickermood.articles import News, NewsSummary, Summary
+from tickermood.database.compression import ZLIB_HEADER, compress, decompress
+from tickermood.database.crud import DatabaseWriter, TickerMoodDb, dispose_engines
+from tickermood.database.scripts.upgrade import current_revision, upgrade
+from tickermood.database.settings import HEAD_REVISION
+from tickermood.main import TickerMood, parse_node_models
+from tickermood.retention import RetentionPolicy
+from tickermood.exceptions import InvalidLLMError
+from tickermood.subject import Subject, LLM, clear_model_availability_cache
 from tickermood.types import DatabaseConfig
 
 
@@ -23,3 +46,645 @@ def test_tickermood() -> None:
     ticker_mood = TickerMood.from_symbols(["IQV", "GOOG", "VKTX"])
     ticker_mood.run()
     subject = ticker_mood.subjects[0]
+
+
+def test_model_availability_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def check(model_name: str) -> bool:
+        calls.append(model_name)
+        return True
+
+    monkeypatch.setattr("tickermood.subject.check_ollama_model", check)
+    clear_model_availability_cache()
+    LLM(model_name="qwen3:4b", model_type=ChatOllama)
+    LLM(model_name="qwen3:4b", model_type=ChatOllama)
+    LLM(model_name="qwen3:4b", model_type=ChatOllama, skip_validation=True)
+    assert calls == ["qwen3:4b"]
+    LLM(model_name="qwen3:4b", model_type=ChatOllama).preflight(use_cache=False)
+    assert calls == ["qwen3:4b", "qwen3:4b"]
+
+
+def test_model_availability_cache_skips_failures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    results = [False, True]
+    monkeypatch.setattr(
+        "tickermood.subject.check_ollama_model", lambda model_name: results.pop(0)
+    )
+    clear_model_availability_cache()
+    with pytest.raises(InvalidLLMError):
+        LLM(model_name="qwen3:4b", model_type=ChatOllama)
+    LLM(model_name="qwen3:4b", model_type=ChatOllama)
+    LLM(model_name="qwen3:4b", model_type=ChatOllama)
+    assert results == []
+
+
+def test_chat_model_per_event_loop() -> None:
+    llm = LLM(model_name="qwen3:4b", model_type=ChatOllama, skip_validation=True)
+
+    async def get_model() -> object:
+        return llm.get_model()
+
+    assert llm.get_model() is llm.get_model()
+    first, second = asyncio.run(get_model()), asyncio.run(get_model())
+    assert first is not second
+    assert llm.get_model() not in (first, second)
+
+
+def test_llm_warm_up(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    monkeypatch.setattr(
+        "tickermood.subject.ollama.generate",
+        lambda **kwargs: calls.append(kwargs["keep_alive"]),
+    )
+    llm = LLM(
+        model_name="qwen3:4b",
+        model_type=ChatOllama,
+        skip_validation=True,
+        keep_alive="1h",
+    )
+    with llm.loaded() as load_time:
+        assert load_time is not None
+        assert calls == ["1h"]
+    assert calls == ["1h", 0]
+    assert llm.get_model().keep_alive == "1h"
+
+
+def test_llm_node_models() -> None:
+    llm = LLM(
+        model_name="qwen3:4b",
+        model_type=ChatOllama,
+        skip_validation=True,
+        node_models={"summarize": "qwen3:1.7b"},
+    )
+    assert llm.model_names() == ["qwen3:4b", "qwen3:1.7b"]
+    assert llm.get_model("summarize").model == "qwen3:1.7b"
+    assert llm.get_model("reduce").model == "qwen3:4b"
+    assert llm.get_model("reduce") is llm.get_model()
+    assert parse_node_models(["reduce=qwen3:8b"]) == {"reduce": "qwen3:8b"}
+    with pytest.raises(typer.BadParameter):
+        parse_node_models(["unknown=qwen3:8b"])
+
+
+def test_embedding_store(monkeypatch: pytest.MonkeyPatch) -> None:
+    vocabulary = ["palantir", "earnings", "contract", "army", "oil"]
+
+    def embed(model: str, input: List[str]) -> EmbedResponse:
+        return EmbedResponse(
+            embeddings=[
+                [float(text.lower().count(word)) for word in vocabulary]
+                for text in input
+            ]
+        )
+
+    monkeypatch.setattr("tickermood.embeddings.ollama.embed", embed)
+    with tempfile.TemporaryDirectory() as d:
+        database_config = DatabaseConfig(database_path=Path(d) / "test.db")
+        subject = Subject(
+            symbol="PLTR",
+            news=[
+                News(url="a", source="Yahoo", content="Palantir earnings beat."),
+                News(url="b", source="Yahoo", content="Palantir army contract."),
+            ],
+        )
+        subject.save(database_config)
+        assert subject.save_embeddings(database_config, "embed") == 2
+        assert subject.save_embeddings(database_config, "embed") == 0
+        db = TickerMoodDb(database_path=database_config.database_path)
+        matches = db.similar("army contract", k=1, model_name="embed")
+        assert [m.url for m in matches] == ["b"]
+        assert matches[0].score == pytest.approx(2 / 6**0.5)
+        next_subject = Subject(
+            symbol="PLTR",
+            news=[
+                News(url="c", source="Investing", content="Palantir army contract!"),
+                News(url="d", source="Investing", content="Oil prices fall."),
+            ],
+        )
+        next_subject.remove_duplicate_news(database_config, "embed")
+        assert [n.url for n in next_subject.news] == ["d"]
+
+
+def test_embeddings_go_through_writer(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        "tickermood.embeddings.ollama.embed",
+        lambda model, input: EmbedResponse(embeddings=[[1.0, 0.0] for _ in input]),
+    )
+    threads = []
+    write_embedding_rows = TickerMoodDb.write_embedding_rows
+
+    def record(self: TickerMoodDb, rows: List[Dict[str, Any]]) -> None:
+        threads.append(threading.current_thread().name)
+        write_embedding_rows(self, rows)
+
+    monkeypatch.setattr(TickerMoodDb, "write_embedding_rows", record)
+    with tempfile.TemporaryDirectory() as d:
+        database_config = DatabaseConfig(database_path=Path(d) / "test.db")
+        ticker_mood = TickerMood(
+            subjects=[],
+            llm=LLM(model_name="qwen3:4b", model_type=ChatOllama, skip_validation=True),
+            database_config=database_config,
+            embedding_model="embed",
+        )
+        subject = Subject(
+            symbol="PLTR",
+            news=[News(url="https://e.com/a", source="Yahoo", content="Palantir.")],
+        )
+        with ticker_mood.database_writer():
+            ticker_mood.save(subject)
+        assert threads == ["tickermood-db-writer"]
+        assert len(ticker_mood.embeddings(subject)) == 0
+        dispose_engines()
+
+
+def test_engine_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    monkeypatch.setattr(
+        "tickermood.database.crud.upgrade",
+        lambda url, no_migration=False: calls.append(upgrade(url, no_migration)),
+    )
+    with tempfile.TemporaryDirectory() as d:
+        database_config = DatabaseConfig(database_path=Path(d) / "test.db")
+        subject = Subject(symbol="AAPL")
+        subject.save(database_config)
+        subject.save(database_config)
+        assert subject.load(database_config).symbol == "AAPL"
+        assert len(calls) == 1
+        dispose_engines()
+        subject.load(database_config)
+        assert len(calls) == 2
+
+
+def test_article_tables_backfill() -> None:
+    news = {"url": "https://www.example.com/a/?utm_source=x", "source": "Yahoo"}
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "test.db"
+        config = Config(
+            Path(tickermood.__file__).parent / "database/alembic/alembic.ini"
+        )
+        config.set_main_option(
+            "script_location",
+            str(Path(tickermood.__file__).parent / "database/alembic"),
+        )
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        command.upgrade(config, "2e72c6efcc82")
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "INSERT INTO subject (symbol, date, news, news_summary, price_target_news) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    "PLTR",
+                    "2025-01-01 00:00:00.000000",
+                    json.dumps([news | {"content": "Palantir news."}]),
+                    json.dumps([news | {"content": "Summary."}]),
+                    json.dumps([{"source": "Yahoo", "content": "{}"}]),
+                ),
+            )
+        db = TickerMoodDb(database_path=path)
+        subject = db.load(Subject(symbol="PLTR"))
+        assert [n.content for n in subject.news] == ["Palantir news."]
+        assert [n.content for n in subject.news_summary] == ["Summary."]
+        assert len(subject.price_target_news) == 1
+        assert [(h.symbol, h.kind) for h in db.search_text("summary")] == [
+            ("PLTR", "news_summary")
+        ]
+        assert db.has_article("https://example.com/a")
+        assert not db.has_article("https://example.com/b")
+        with sqlite3.connect(path) as connection:
+            assert connection.execute("SELECT news FROM subject").fetchone() == (None,)
+        command.downgrade(config, "2e72c6efcc82")
+        with sqlite3.connect(path) as connection:
+            (restored,) = connection.execute("SELECT news FROM subject").fetchone()
+        assert json.loads(restored)[0]["content"] == "Palantir news."
+        dispose_engines()
+
+
+def test_backfill_keeps_summaries_per_snapshot() -> None:
+    news = {"url": "https://example.com/earnings", "source": "Yahoo"}
+    dates = ["2026-01-01 00:00:00.000000", "2026-01-02 00:00:00.000000"]
+    with tempfile.TemporaryDirectory() as d:
+        path = Path(d) / "test.db"
+        config = Config(
+            Path(tickermood.__file__).parent / "database/alembic/alembic.ini"
+        )
+        config.set_main_option(
+            "script_location",
+            str(Path(tickermood.__file__).parent / "database/alembic"),
+        )
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        command.upgrade(config, "2e72c6efcc82")
+        with sqlite3.connect(path) as connection:
+            connection.executemany(
+                "INSERT INTO subject (symbol, date, news, news_summary) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        "AAPL",
+                        date,
+                        json.dumps([news | {"content": "Apple earnings."}]),
+                        json.dumps([news | {"content": f"Day {day} summary."}]),
+                    )
+                    for day, date in zip(["one", "two"], dates)
+                ],
+            )
+        db = TickerMoodDb(database_path=path)
+        assert db.load(Subject(symbol="AAPL")).news_summary[0].content == (
+            "Day two summary."
+        )
+        for day, date in [("one", datetime(2026, 1, 1)), ("two", datetime(2026, 1, 2))]:
+            hits = db.search_text(day)
+            assert [(h.kind, h.date) for h in hits] == [("news_summary", date)]
+        dispose_engines()
+        command.downgrade(config, "2e72c6efcc82")
+        with sqlite3.connect(path) as connection:
+            restored = connection.execute(
+                "SELECT news_summary FROM subject ORDER BY date"
+            ).fetchall()
+        assert [json.loads(r)[0]["content"] for (r,) in restored] == [
+            "Day one summary.",
+            "Day two summary.",
+        ]
+
+
+def test_database_writer() -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        subjects = [
+            Subject(
+                symbol=f"S{i}",
+                news=[News(url=f"https://e.com/{i}", source="Yahoo", content="n")],
+            )
+            for i in range(20)
+        ]
+        db.write_many(subjects[:10])
+        with DatabaseWriter(db, batch_size=5) as writer:
+            threads = [
+                threading.Thread(target=writer.submit, args=(s,)) for s in subjects[10:]
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        for subject in subjects:
+            assert db.load(subject).news[0].url == subject.news[0].url
+        with db._engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        dispose_engines()
+
+
+def test_database_writer_retries_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        write_many = TickerMoodDb.write_many
+
+        def failing_write_many(self: TickerMoodDb, subjects: List[Subject]) -> None:
+            if any(s.symbol == "BAD" for s in subjects):
+                raise RuntimeError("bad row")
+            write_many(self, subjects)
+
+        monkeypatch.setattr(TickerMoodDb, "write_many", failing_write_many)
+        writer = DatabaseWriter(db)
+        subjects = [Subject(symbol=symbol) for symbol in ["GOOD", "BAD", "FINE"]]
+        futures: List[Future[None]] = [Future() for _ in subjects]
+        writer._write([(s, [], [], f) for s, f in zip(subjects, futures)])
+        assert futures[0].result() is None
+        assert futures[2].result() is None
+        with pytest.raises(RuntimeError, match="bad row"):
+            futures[1].result()
+        assert db.load(subjects[2]).symbol == "FINE"
+        dispose_engines()
+
+
+def test_compressed_content(monkeypatch: pytest.MonkeyPatch) -> None:
+    content = "Palantir reported strong quarterly revenue growth. " * 200
+    with tempfile.TemporaryDirectory() as d:
+        database_config = DatabaseConfig(database_path=Path(d) / "test.db")
+        subject = Subject(
+            symbol="PLTR",
+            news=[News(url="https://e.com/a", source="Yahoo", content=content)],
+        )
+        subject.save(database_config)
+        assert subject.load(database_config).news[0].content == content
+        with sqlite3.connect(database_config.database_path) as connection:
+            (stored,) = connection.execute("SELECT content FROM article").fetchone()
+        assert isinstance(stored, bytes)
+        assert len(stored) < len(content) / 10
+        dispose_engines()
+    monkeypatch.setattr("tickermood.database.compression._zstd", lambda: None)
+    assert compress(content).startswith(ZLIB_HEADER)
+    assert decompress(compress(content)) == content
+    assert decompress(content.encode("utf-8")) == content
+
+
+def test_latest_and_history() -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write_many(
+            [
+                Subject(
+                    symbol=symbol,
+                    date=datetime(2025, 1, day),
+                    consensus=consensus,
+                    high_price_target=float(day),
+                    news=[News(url="https://e.com/a", source="Yahoo", content="n")],
+                )
+                for symbol in ["AAPL", "PLTR", "NVDA"]
+                for day, consensus in [(1, "Hold"), (2, "Buy"), (3, "Strong Buy")]
+            ]
+        )
+        latest = db.latest(["PLTR", "NVDA"])
+        assert [(s.symbol, s.consensus) for s in latest] == [
+            ("NVDA", "Strong Buy"),
+            ("PLTR", "Strong Buy"),
+        ]
+        assert len(db.latest()) == 3
+        history = db.history("AAPL", since=datetime(2025, 1, 2))
+        assert [s.high_price_target for s in history] == [2.0, 3.0]
+        dispose_engines()
+
+
+def test_search_text() -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write_many(
+            [
+                Subject(
+                    symbol="AAPL",
+                    date=datetime(2025, 1, 1),
+                    news=[
+                        News(
+                            url="https://e.com/a",
+                            source="Yahoo",
+                            title="Apple earnings",
+                            content="Apple reported record iPhone revenues.",
+                        )
+                    ],
+                ),
+                Subject(
+                    symbol="NVDA",
+                    date=datetime(2025, 1, 2),
+                    news=[
+                        News(
+                            url="https://e.com/b",
+                            source="Yahoo",
+                            content="Nvidia sold more data center chips.",
+                        )
+                    ],
+                    news_summary=[
+                        NewsSummary(
+                            url="https://e.com/c",
+                            source="Yahoo",
+                            content="Chip demand keeps growing.",
+                        )
+                    ],
+                ),
+            ]
+        )
+        db.write(
+            Subject(
+                symbol="NVDA",
+                date=datetime(2025, 1, 3),
+                news=[
+                    News(
+                        url="https://e.com/b",
+                        source="Yahoo",
+                        content="Nvidia sold more gaming cards.",
+                    )
+                ],
+            )
+        )
+        hits = db.search_text("revenue")
+        assert [(h.symbol, h.title) for h in hits] == [("AAPL", "Apple earnings")]
+        assert "[revenues]" in hits[0].snippet
+        assert {(h.kind, h.url) for h in db.search_text("chip")} == {
+            ("news_summary", "https://e.com/c")
+        }
+        hits = db.search_text("nvidia", symbols=["NVDA"])
+        assert [(h.date, h.kind) for h in hits] == [(datetime(2025, 1, 3), "news")]
+        assert db.search_text("chips", since=datetime(2025, 1, 3)) == []
+        dispose_engines()
+
+
+def test_summaries_per_subject() -> None:
+    now = datetime.now()
+    news = News(url="https://e.com/chips", source="Yahoo", content="Chip sales.")
+    subjects = [
+        Subject(
+            symbol=symbol,
+            date=date,
+            news=[news],
+            news_summary=[
+                NewsSummary(url=news.url, source="Yahoo", content=f"{word} outlook.")
+            ],
+        )
+        for symbol, date, word in [
+            ("NVDA", now - timedelta(days=400), "Stale"),
+            ("NVDA", now, "Bullish"),
+            ("AMD", now, "Bearish"),
+        ]
+    ]
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write_many(subjects)
+        assert db.load(Subject(symbol="NVDA")).news_summary[0].content == (
+            "Bullish outlook."
+        )
+        assert db.load(Subject(symbol="AMD")).news_summary[0].content == (
+            "Bearish outlook."
+        )
+        assert [h.symbol for h in db.search_text("bearish")] == ["AMD"]
+        assert [h.symbol for h in db.search_text("bullish")] == ["NVDA"]
+        report = db.compact(RetentionPolicy(summary_days=365), vacuum=False)
+        assert (report.summaries, report.documents) == (1, 1)
+        assert db.search_text("stale") == []
+        assert [h.symbol for h in db.search_text("bullish")] == ["NVDA"]
+        assert {h.symbol for h in db.search_text("chip")} == {"AMD", "NVDA"}
+        dispose_engines()
+
+
+@pytest.mark.parametrize(
+    "query", ["S&P 500", "Q3: results", "non-GAAP", "AT&T", '"AT&T" Q3']
+)
+def test_search_text_escapes_query(query: str) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write(
+            Subject(
+                symbol="T",
+                news=[
+                    News(
+                        url="https://e.com/t",
+                        source="Yahoo",
+                        content="AT&T beat the S&P 500 with Q3: results "
+                        "and non-GAAP margins.",
+                    )
+                ],
+            )
+        )
+        assert [h.url for h in db.search_text(query)] == ["https://e.com/t"]
+        assert db.search_text("  ") == []
+        assert len(db.search_text("non* OR nothing", raw=True)) == 1
+        dispose_engines()
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_export(suffix: str) -> None:
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write_many(
+            [
+                Subject(
+                    symbol=symbol,
+                    date=datetime(2025, 1, day),
+                    consensus="Buy",
+                    high_price_target=float(day) if day > 1 else None,
+                    explanation=f"{symbol} {day}",
+                    summary=Summary(content=f"{symbol} outlook") if day == 3 else None,
+                )
+                for symbol in ["AAPL", "NVDA"]
+                for day in [1, 2, 3]
+            ]
+        )
+        output = Path(d) / f"export{suffix}"
+        assert db.export(output, symbols=["NVDA"], chunk_size=2) == 3
+        frame = (
+            pd.read_parquet(output) if suffix == ".parquet" else pd.read_feather(output)
+        )
+        assert list(frame.columns) == [
+            "symbol",
+            "date",
+            "consensus",
+            "recommendation",
+            "high_price_target",
+            "low_price_target",
+            "fair_value",
+        ]
+        assert frame.high_price_target.isna().tolist() == [True, False, False]
+        assert frame.date.tolist() == [datetime(2025, 1, day) for day in [1, 2, 3]]
+        assert db.export(output, include_text=True, since=datetime(2025, 1, 3)) == 2
+        frame = (
+            pd.read_parquet(output) if suffix == ".parquet" else pd.read_feather(output)
+        )
+        assert frame.explanation.tolist() == ["AAPL 3", "NVDA 3"]
+        assert frame.summary.tolist() == ["AAPL outlook", "NVDA outlook"]
+        with pytest.raises(ValueError):
+            db.export(Path(d) / "export.csv")
+        dispose_engines()
+
+
+def test_compact() -> None:
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as d:
+        db = TickerMoodDb(database_path=Path(d) / "test.db")
+        db.write_many(
+            [
+                Subject(
+                    symbol="AAPL",
+                    date=now - timedelta(days=days),
+                    consensus="Buy",
+                    explanation=f"{days} days old",
+                    news=[
+                        News(
+                            url=f"https://e.com/{days}",
+                            source="Yahoo",
+                            content="Apple revenues " * 500,
+                        )
+                    ],
+                    news_summary=[
+                        NewsSummary(
+                            url=f"https://e.com/{days}",
+                            source="Yahoo",
+                            content=f"Apple summary {days}",
+                        )
+                    ],
+                )
+                for days in [1, 60, 90, 400]
+            ]
+        )
+        assert db.vacuum() == 0
+        assert db.enable_incremental_vacuum()
+        assert not db.enable_incremental_vacuum()
+        report = db.compact(
+            RetentionPolicy(article_days=30, summary_days=365),
+            batch_size=2,
+            vacuum_pages=2,
+        )
+        assert report.links == 4
+        assert report.articles == 3
+        assert report.summaries == 1
+        assert report.documents == 4
+        assert report.subjects == 1
+        assert report.freed_pages == 2
+        assert db.vacuum(step=1) > 0
+        assert db.vacuum() == 0
+        history = db.history("AAPL")
+        assert [s.consensus for s in history] == ["Buy"] * 4
+        assert [s.explanation for s in history] == [
+            None,
+            "90 days old",
+            "60 days old",
+            "1 days old",
+        ]
+        assert {(h.kind, h.url) for h in db.search_text("apple")} == {
+            ("news", "https://e.com/1"),
+            ("news_summary", "https://e.com/1"),
+            ("news_summary", "https://e.com/60"),
+            ("news_summary", "https://e.com/90"),
+        }
+        assert len(db.search_text("revenues")) == 1
+        assert db.has_article("https://e.com/1")
+        assert not db.has_article("https://e.com/60")
+        assert db.compact(RetentionPolicy(article_days=30)) == db.compact(
+            RetentionPolicy(article_days=None, summary_days=None)
+        )
+        with sqlite3.connect(Path(d) / "test.db") as connection:
+            assert connection.execute("PRAGMA auto_vacuum").fetchone() == (2,)
+        dispose_engines()
+
+
+def test_upgrade_skips_alembic_at_head(monkeypatch: pytest.MonkeyPatch) -> None:
+    script = ScriptDirectory(str(Path(tickermood.__file__).parent / "database/alembic"))
+    assert script.get_current_head() == HEAD_REVISION
+    with tempfile.TemporaryDirectory() as d:
+        url = f"sqlite:///{Path(d) / 'test.db'}"
+        assert current_revision(url) is None
+        upgrade(url)
+        assert current_revision(url) == HEAD_REVISION
+
+        def fail(*args: object) -> None:
+            raise AssertionError("alembic should not run at head")
+
+        monkeypatch.setattr(command, "upgrade", fail)
+        upgrade(url)
+
+
+def test_skip_fresh_subjects() -> None:
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as d:
+        database_config = DatabaseConfig(database_path=Path(d) / "test.db")
+        ticker_mood = TickerMood(
+            subjects=[Subject(symbol=s) for s in ["AAPL", "NVDA", "PLTR"]],
+            llm=LLM(model_name="qwen3:4b", model_type=ChatOllama, skip_validation=True),
+            database_config=database_config,
+        )
+        ticker_mood.skip_fresh_subjects()
+        assert len(ticker_mood.subjects) == 3
+        TickerMoodDb(database_path=database_config.database_path).write_many(
+            [
+                Subject(symbol="AAPL", date=now - timedelta(days=2)),
+                Subject(
+                    symbol="AAPL", date=now - timedelta(minutes=10), consensus="Buy"
+                ),
+                Subject(symbol="NVDA", date=now - timedelta(days=1), consensus="Hold"),
+                Subject(symbol="PLTR", date=now - timedelta(minutes=5)),
+            ]
+        )
+        ticker_mood.skip_fresh_subjects()
+        assert len(ticker_mood.subjects) == 3
+        ticker_mood.max_age = timedelta(hours=1)
+        assert ticker_mood.fresh_symbols() == {"AAPL"}
+        ticker_mood.skip_fresh_subjects()
+        assert [s.symbol for s in ticker_mood.subjects] == ["NVDA", "PLTR"]
+        dispose_engines()
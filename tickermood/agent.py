@@ -1,18 +1,59 @@
+import asyncio
 import json
 import logging
 import re
-from typing import get_args, Type
-
-from langchain_core.messages import SystemMessage, HumanMessage
+import sqlite3
+from contextlib import asynccontextmanager, closing, contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import (
+    get_args,
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+
+import aiosqlite
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage, HumanMessage
 from langchain_core.output_parsers import JsonOutputParser
-from langgraph.graph import StateGraph
+from langchain_ollama import ChatOllama
+from langchain_core.runnables import RunnableConfig
+from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 from pydantic import BaseModel
 
-from tickermood.subject import Subject, LLMSubject, PriceTarget, Consensus, NewsAnalysis
+from tickermood.articles import ArticleSummaries, News
+from tickermood.subject import Subject, LLMSubject, PriceTarget, Analysis
+from tickermood.compression import compress_text
+from tickermood.relevance import subject_terms
+from tickermood.tokens import count_tokens, group_texts, split_text
 from tickermood.types import ConsensusType
 
 logger = logging.getLogger(__name__)
+T = TypeVar("T", bound=BaseModel)
+LLMResponse = Union[BaseMessage, BaseException]
+MAX_STRUCTURED_OUTPUT_RETRIES = 2
+COMPLETED_TABLE = "completed_subject"
+llm_semaphore: ContextVar[Optional[asyncio.Semaphore]] = ContextVar(
+    "llm_semaphore", default=None
+)
 
 
 def remove_tagged_text(text: str) -> str:
@@ -25,51 +66,262 @@ def get_json_schema(model: Type[BaseModel]) -> str:
     return json.dumps(model.model_json_schema().get("properties", {}), indent=4)
 
 
-def parse_json_output(model_response: str, model: Type[BaseModel]) -> BaseModel:
+def load_json_output(model_response: str, model: Type[T]) -> T:
     parser = JsonOutputParser()
-    raw_model_response = remove_tagged_text(model_response)
+    parsed_output = parser.parse(remove_tagged_text(model_response))
+    return model.model_validate(parsed_output)
+
+
+def parse_json_output(model_response: str, model: Type[BaseModel]) -> BaseModel:
     try:
-        parsed_output = parser.parse(raw_model_response)
-        return model.model_validate(parsed_output)
+        return load_json_output(model_response, model)
     except Exception as e:
         logger.error(
-            f"Failed to parse model response into {model.__name__}: {e}. parsed_output: {raw_model_response}"
+            f"Failed to parse model response into {model.__name__}: {e}. "
+            f"parsed_output: {remove_tagged_text(model_response)}"
         )
         return model()
 
 
-def summarize(state: LLMSubject) -> LLMSubject:
-    llm = state.get_model()
+def invoke_structured(
+    llm: BaseChatModel, messages: List[BaseMessage], model: Type[T]
+) -> T:
+    attempts = 1 + MAX_STRUCTURED_OUTPUT_RETRIES
+    for attempt in range(1, attempts + 1):
+        try:
+            if isinstance(llm, (ChatOllama, ChatOpenAI)):
+                result = llm.with_structured_output(model).invoke(messages)
+                return model.model_validate(result)
+            response = llm.invoke(messages)
+            return load_json_output(str(response.content), model)
+        except Exception as e:  # noqa: PERF203
+            logger.warning(
+                f"Invalid {model.__name__} output (attempt {attempt}/{attempts}): {e}"
+            )
+    logger.error(f"Failed to get a valid {model.__name__} after {attempts} attempts.")
+    return model()
+
+
+def set_llm_semaphore(limit: int) -> None:
+    llm_semaphore.set(asyncio.Semaphore(limit))
+
+
+@asynccontextmanager
+async def llm_slot() -> AsyncGenerator[None, None]:
+    semaphore = llm_semaphore.get()
+    if semaphore is None:
+        yield
+        return
+    async with semaphore:
+        yield
+
+
+async def ainvoke_llm(llm: BaseChatModel, messages: List[BaseMessage]) -> BaseMessage:
+    async with llm_slot():
+        return await llm.ainvoke(messages)
+
+
+async def abatch_llm(
+    llm: BaseChatModel, messages: List[List[BaseMessage]]
+) -> List[LLMResponse]:
+    return list(
+        await asyncio.gather(
+            *(ainvoke_llm(llm, m) for m in messages), return_exceptions=True
+        )
+    )
+
+
+def batch_llm(
+    llm: BaseChatModel, messages: List[List[BaseMessage]]
+) -> List[LLMResponse]:
+    return list(llm.batch(messages, return_exceptions=True))  # type: ignore[arg-type]
+
+
+def response_texts(
+    responses: Sequence[LLMResponse], fallbacks: Optional[Sequence[str]] = None
+) -> List[str]:
+    errors = [r for r in responses if isinstance(r, BaseException)]
+    for error in errors:
+        if not isinstance(error, Exception):
+            raise error
+    if errors and len(errors) == len(responses):
+        raise errors[0]
+    texts = []
+    for i, response in enumerate(responses):
+        if not isinstance(response, BaseException):
+            texts.append(remove_tagged_text(str(response.content)))
+        elif fallbacks is None:
+            logger.error(f"LLM call failed: {response}")
+        else:
+            logger.warning(f"LLM call failed, keeping its input text: {response}")
+            texts.append(fallbacks[i])
+    return texts
+
+
+async def ainvoke_structured(
+    llm: BaseChatModel, messages: List[BaseMessage], model: Type[T]
+) -> T:
+    attempts = 1 + MAX_STRUCTURED_OUTPUT_RETRIES
+    for attempt in range(1, attempts + 1):
+        try:
+            if isinstance(llm, (ChatOllama, ChatOpenAI)):
+                async with llm_slot():
+                    result = await llm.with_structured_output(model).ainvoke(messages)
+                return model.model_validate(result)
+            response = await ainvoke_llm(llm, messages)
+            return load_json_output(str(response.content), model)
+        except Exception as e:  # noqa: PERF203
+            logger.warning(
+                f"Invalid {model.__name__} output (attempt {attempt}/{attempts}): {e}"
+            )
+    logger.error(f"Failed to get a valid {model.__name__} after {attempts} attempts.")
+    return model()
+
+
+SUMMARY_SEPARATOR = "####\n"
+MAX_REDUCE_DEPTH = 5
+
+
+def summarize_messages(state: LLMSubject, content: str) -> List[BaseMessage]:
     system_message = SystemMessage(
         "You are a helpful assistant that summarizes financial articles. "
         "Reasoning, thought process, or annotations like <think>. "
         "Only return the final summary in plain text. No tags, no notes, no process."
         "Only few sentences."
     )
-    article = state.get_next_article()
-    if article:
-        human_message = HumanMessage(
-            f"""
-            Summarize the text below, which is about the equity {state.to_name()}.
-            - Include only information that is directly relevant to {state.to_name()}.
-            - Exclude unrelated market commentary, other companies, or general economic news.
-            - The output should be an extensive summary in plain language, with no extra text or explanations.
-
-            Article:
-            {article.content}
-            """
+    human_message = HumanMessage(
+        f"""
+        Summarize the text below, which is about the equity {state.to_name()}.
+        - Include only information that is directly relevant to {state.to_name()}.
+        - Exclude unrelated market commentary, other companies, or general economic news.
+        - The output should be an extensive summary in plain language, with no extra text or explanations.
+
+        Article:
+        {content}
+        """
+    )
+    return [system_message, human_message]
+
+
+def article_content(state: LLMSubject, article: News) -> str:
+    if not state.compression_tokens:
+        return article.content
+    return compress_text(
+        article.content,
+        state.compression_tokens,
+        state.node_model_name("summarize"),
+        subject_terms(state),
+    )
+
+
+def packed_summarize_messages(
+    state: LLMSubject, articles: List[Tuple[News, str]]
+) -> List[BaseMessage]:
+    system_message = SystemMessage(
+        "You are a helpful assistant that summarizes financial articles. "
+        "Only return the final summaries, no tags, no notes, no process."
+    )
+    packed = SUMMARY_SEPARATOR.join(
+        f"URL: {article.url}\n{content}\n" for article, content in articles
+    )
+    human_message = HumanMessage(
+        f"""
+        You are a JSON generator. Output MUST be a single valid JSON object matching the schema below.
+        Summarize separately each of the articles below, which are about the equity {state.to_name()}.
+        - Return one entry per article, with the article URL copied exactly in 'url'.
+        - Include only information that is directly relevant to {state.to_name()}.
+        - Each summary should be a few sentences in plain language.
+
+        Schema (use exactly these keys and types):
+        {get_json_schema(ArticleSummaries)}
+
+        Articles:
+        {packed}
+        """
+    )
+    return [system_message, human_message]
+
+
+def next_articles(state: LLMSubject) -> List[Tuple[News, str]]:
+    articles: List[Tuple[News, str]] = []
+    total_tokens = 0
+    for article in state.pending_articles():
+        if not state.pack_tokens:
+            return [(article, article_content(state, article))]
+        content = article_content(state, article)
+        tokens = count_tokens(content, state.node_model_name("summarize"))
+        if articles and (not article.url or total_tokens + tokens > state.pack_tokens):
+            break
+        articles.append((article, content))
+        total_tokens += tokens
+        if not article.url or tokens > state.pack_tokens:
+            break
+    return articles
+
+
+def article_chunks(state: LLMSubject, content: str) -> List[str]:
+    return split_text(
+        content, state.max_input_tokens, state.node_model_name("summarize")
+    )
+
+
+def chunk_messages(state: LLMSubject, content: str) -> List[List[BaseMessage]]:
+    return [summarize_messages(state, c) for c in article_chunks(state, content)]
+
+
+def add_news_summaries(
+    state: LLMSubject, articles: List[Tuple[News, str]], summaries: List[str]
+) -> Dict[str, Any]:
+    for (article, _), summary in zip(articles, summaries, strict=True):
+        state.add_news_summary(summary, article)
+    return {
+        "news_summary": state.news_summary,
+        "pending_news": state.pending_news,
+        "pending_index": state.pending_index,
+    }
+
+
+def summarize(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("summarize")
+    articles = next_articles(state)
+    packed: Dict[Optional[str], str] = {}
+    if len(articles) > 1:
+        packed = invoke_structured(
+            llm, packed_summarize_messages(state, articles), ArticleSummaries
+        ).by_url()
+    summaries = [
+        packed.get(article.url)
+        or "\n".join(response_texts(batch_llm(llm, chunk_messages(state, content))))
+        for article, content in articles
+    ]
+    return add_news_summaries(state, articles, summaries)
+
+
+async def asummarize(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("summarize")
+    articles = next_articles(state)
+    packed: Dict[Optional[str], str] = {}
+    if len(articles) > 1:
+        packed = (
+            await ainvoke_structured(
+                llm, packed_summarize_messages(state, articles), ArticleSummaries
+            )
+        ).by_url()
+    summaries = [
+        packed.get(article.url)
+        or "\n".join(
+            response_texts(await abatch_llm(llm, chunk_messages(state, content)))
         )
-        response = llm.invoke([system_message, human_message])
-        state.add_news_summary(remove_tagged_text(str(response.content)), article)
-    return state
+        for article, content in articles
+    ]
+    return add_news_summaries(state, articles, summaries)
 
 
 def has_more_articles(state: LLMSubject) -> bool:
     return state.get_next_article() is not None
 
 
-def reduce(state: LLMSubject) -> LLMSubject:
-    llm = state.get_model()
+def reduce_messages(state: LLMSubject, articles: str) -> List[BaseMessage]:
     system_message = SystemMessage(
         "You are a helpful and smart financial assistant that can summarizes finance articles."
     )
@@ -82,16 +334,90 @@ def reduce(state: LLMSubject) -> LLMSubject:
         4. Output only the summary and the Buy/Sell/Cautious assessment.
 
         Articles:
-        {state.combined_summary_news()}
+        {articles}
         """
     )
-    response = llm.invoke([system_message, human_message])
+    return [system_message, human_message]
+
+
+def reduce_groups(state: LLMSubject, summaries: List[str]) -> List[List[str]]:
+    combined = SUMMARY_SEPARATOR.join(summaries)
+    if (
+        len(summaries) <= 1
+        or count_tokens(combined, state.node_model_name("reduce"))
+        <= state.max_input_tokens
+    ):
+        return []
+    return group_texts(
+        summaries,
+        state.max_input_tokens,
+        state.node_model_name("reduce"),
+        SUMMARY_SEPARATOR,
+    )
+
+
+def joined_groups(groups: List[List[str]]) -> List[str]:
+    return [SUMMARY_SEPARATOR.join(g) for g in groups]
+
+
+def group_messages(
+    state: LLMSubject, groups: List[List[str]]
+) -> List[List[BaseMessage]]:
+    return [reduce_messages(state, text) for text in joined_groups(groups)]
+
+
+def news_summaries(state: LLMSubject) -> List[str]:
+    return [n.content for n in state.news_summary if n.content]
+
+
+def add_summary(state: LLMSubject, response: BaseMessage) -> Dict[str, Any]:
     state.add_summary(remove_tagged_text(str(response.content)))
-    return state
+    return {"summary": state.summary}
+
+
+def collapse_summaries(
+    llm: BaseChatModel, state: LLMSubject, summaries: List[str]
+) -> List[str]:
+    for _ in range(MAX_REDUCE_DEPTH):
+        groups = reduce_groups(state, summaries)
+        if not groups:
+            break
+        summaries = response_texts(
+            batch_llm(llm, group_messages(state, groups)), joined_groups(groups)
+        )
+    return summaries
+
+
+async def acollapse_summaries(
+    llm: BaseChatModel, state: LLMSubject, summaries: List[str]
+) -> List[str]:
+    for _ in range(MAX_REDUCE_DEPTH):
+        groups = reduce_groups(state, summaries)
+        if not groups:
+            break
+        summaries = response_texts(
+            await abatch_llm(llm, group_messages(state, groups)), joined_groups(groups)
+        )
+    return summaries
+
+
+def reduce(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("reduce")
+    summaries = collapse_summaries(llm, state, news_summaries(state))
+    response = llm.invoke(reduce_messages(state, SUMMARY_SEPARATOR.join(summaries)))
+    return add_summary(state, response)
+
+
+async def areduce(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("reduce")
+    summaries = await acollapse_summaries(llm, state, news_summaries(state))
+    response = await ainvoke_llm(
+        llm, reduce_messages(state, SUMMARY_SEPARATOR.join(summaries))
+    )
+    return add_summary(state, response)
 
 
-def price_target(state: LLMSubject) -> LLMSubject:
-    llm = state.get_model()
+def price_target_messages(state: LLMSubject) -> List[BaseMessage]:
     system_message = SystemMessage(
         "You are a helpful assistant that summarizes financial articles."
     )
@@ -116,14 +442,62 @@ def price_target(state: LLMSubject) -> LLMSubject:
         {state.combined_price_target_news()}
         """
     )
-    response = llm.invoke([system_message, human_message])
-    state.add(parse_json_output(str(response.content), PriceTarget))
-    return state
+    return [system_message, human_message]
+
+
+def merge_price_targets(
+    price_target_: PriceTarget, structured: Optional[PriceTarget]
+) -> PriceTarget:
+    if structured is None:
+        return price_target_
+    return PriceTarget(
+        high_price_target=(
+            structured.high_price_target
+            if structured.high_price_target is not None
+            else price_target_.high_price_target
+        ),
+        low_price_target=(
+            structured.low_price_target
+            if structured.low_price_target is not None
+            else price_target_.low_price_target
+        ),
+        fair_value=(
+            structured.fair_value
+            if structured.fair_value is not None
+            else price_target_.fair_value
+        ),
+        summary_price_target=" ".join(
+            s
+            for s in [
+                structured.summary_price_target,
+                price_target_.summary_price_target,
+            ]
+            if s
+        ),
+    )
+
+
+def price_target(state: LLMSubject) -> Dict[str, Any]:
+    structured = state.structured_price_target()
+    if structured and not state.combined_price_target_news():
+        return structured.model_dump()
+    llm = state.get_model("price_target")
+    price_target_ = invoke_structured(llm, price_target_messages(state), PriceTarget)
+    return merge_price_targets(price_target_, structured).model_dump()
 
 
-def get_consensus(state: LLMSubject) -> LLMSubject:
-    llm = state.get_model()
+async def aprice_target(state: LLMSubject) -> Dict[str, Any]:
+    structured = state.structured_price_target()
+    if structured and not state.combined_price_target_news():
+        return structured.model_dump()
+    llm = state.get_model("price_target")
+    price_target_ = await ainvoke_structured(
+        llm, price_target_messages(state), PriceTarget
+    )
+    return merge_price_targets(price_target_, structured).model_dump()
+
 
+def analysis_messages(state: LLMSubject) -> List[BaseMessage]:
     system_message = SystemMessage(
         "You are a helpful assistant that summarizes financial articles."
     )
@@ -132,81 +506,172 @@ def get_consensus(state: LLMSubject) -> LLMSubject:
     You are a JSON generator. Output MUST be ONE valid JSON object. 
     No prose, no markdown, no backticks, no labels before/after the JSON.
 
-    From the text below, summarize the **analyst consensus** for the stock with symbol {state.to_name()}.
-
     Task (about symbol {state.to_name()}):
-    - Read the text and determine the analyst consensus for {state.to_name()}.
+    - Read the text and determine the **analyst consensus** for {state.to_name()}.
     - The "consensus" value MUST be exactly one of: {list(get_args(ConsensusType))}.
     - Give the reasoning behind the consensus given in the "reason" field.
+    - Decide your own stock recommendation from the text.
+    - The "recommendation" value MUST be exactly one of: {list(get_args(ConsensusType))}.
+    - "explanation" MUST be brief (1-3 sentences) and based only on the text.
 
     Schema (use exactly these keys and types):
-    {get_json_schema(Consensus)}
+    {get_json_schema(Analysis)}
 
     Return ONLY the JSON object.
 
     Example output (format only, not the answer):
-    {{"consensus":"Buy","reason": "Analysts are optimistic about the stock's future performance..."}}
+    {{"consensus":"Buy","reason": "Analysts are optimistic about the stock's future performance...",
+    "recommendation":"Hold","explanation": "Recent news is mixed..."}}
 
     Text:
     {state.get_consensus_data()}
     """
     )
-    response = llm.invoke([system_message, human_message])
-    state.add(parse_json_output(str(response.content), Consensus))
-    return state
+    return [system_message, human_message]
 
 
-def get_recommendation(state: LLMSubject) -> LLMSubject:
-    llm = state.get_model()
+def get_analysis(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("get_analysis")
+    return invoke_structured(llm, analysis_messages(state), Analysis).model_dump()
 
-    system_message = SystemMessage(
-        "You are a helpful assistant that summarizes financial articles."
-    )
-    human_message = HumanMessage(
-        f"""
-        You are a JSON generator. Output MUST be one valid JSON object.
-        No prose, no markdown, no backticks, nothing before or after the JSON.
 
-        Task (symbol {state.to_name()}):
-        - Decide a stock recommendation from the text below.
-        - "recommendation" MUST be exactly one of: {list(get_args(ConsensusType))}.
-        - "explanation" MUST be brief (1-3 sentences) and based only on the text.
+async def aget_analysis(state: LLMSubject) -> Dict[str, Any]:
+    llm = state.get_model("get_analysis")
+    analysis = await ainvoke_structured(llm, analysis_messages(state), Analysis)
+    return analysis.model_dump()
 
-        Return ONLY a JSON object with exactly these keys:
-        {{"recommendation": "<one of {list(get_args(ConsensusType))}", "explanation": "<brief reason>"}}
 
-        Text:
-        {state.get_consensus_data()}
-        """
-    )
-    response = llm.invoke([system_message, human_message])
-    state.add(parse_json_output(str(response.content), NewsAnalysis))
-    return state
+def serializable(value: Any) -> Any:
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, dict):
+        return {k: serializable(v) for k, v in value.items()}
+    if type(value) in (list, tuple):
+        return type(value)(serializable(v) for v in value)
+    return value
 
 
-def summarize_agent() -> CompiledStateGraph:
-    graph = StateGraph(LLMSubject)
+class CheckpointSerializer(JsonPlusSerializer):
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        return super().dumps_typed(serializable(obj))
+
+
+@contextmanager
+def sqlite_checkpointer(path: Path) -> Generator[SqliteSaver, Any, None]:
+    with closing(sqlite3.connect(path, check_same_thread=False)) as connection:
+        yield SqliteSaver(connection, serde=CheckpointSerializer())
 
-    graph.add_node("summarize", summarize)
-    graph.add_node("reduce", reduce)
-    graph.add_node("price_target", price_target)
-    graph.add_node("get_consensus", get_consensus)
-    graph.add_node("get_recommendation", get_recommendation)
-    graph.set_entry_point("summarize")
-    graph.add_conditional_edges(
-        "summarize", has_more_articles, {True: "summarize", False: "reduce"}
-    )
-    graph.add_edge("reduce", "price_target")
-    graph.add_edge("price_target", "get_consensus")
-    graph.add_edge("get_consensus", "get_recommendation")
 
-    graph.set_finish_point("get_recommendation")
+@asynccontextmanager
+async def async_sqlite_checkpointer(
+    path: Path,
+) -> AsyncGenerator[AsyncSqliteSaver, None]:
+    async with aiosqlite.connect(path) as connection:
+        yield AsyncSqliteSaver(connection, serde=CheckpointSerializer())
 
-    return graph.compile()
 
+def checkpoint_thread_id(run_id: str, subject: Subject) -> str:
+    return f"{run_id}:{subject.symbol}"
 
-def invoke_summarize_agent(subject: LLMSubject) -> Subject:
 
-    graph = summarize_agent()
-    subject = graph.invoke(subject, config={"recursion_limit": 50})  # type: ignore
-    return Subject.model_validate(subject)
+def mark_completed(path: Path, run_id: str, symbol: str) -> None:
+    with closing(sqlite3.connect(path, timeout=30)) as connection, connection:
+        connection.execute(
+            f"CREATE TABLE IF NOT EXISTS {COMPLETED_TABLE} "
+            "(run_id TEXT, symbol TEXT, PRIMARY KEY (run_id, symbol))"
+        )
+        connection.execute(
+            f"INSERT OR IGNORE INTO {COMPLETED_TABLE} VALUES (?, ?)", (run_id, symbol)
+        )
+
+
+def completed_symbols(path: Path, run_id: str) -> Set[str]:
+    if not path.exists():
+        return set()
+    with closing(sqlite3.connect(path, timeout=30)) as connection:
+        try:
+            rows = connection.execute(
+                f"SELECT symbol FROM {COMPLETED_TABLE} WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        except sqlite3.OperationalError:
+            return set()
+    return {symbol for (symbol,) in rows}
+
+
+def agent_config(
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    thread_id: Optional[str] = None,
+) -> RunnableConfig:
+    config: RunnableConfig = {"recursion_limit": 50, "callbacks": callbacks}
+    if thread_id:
+        config["configurable"] = {"thread_id": thread_id}
+    return config
+
+
+def summarize_agent(
+    asynchronous: bool = False, checkpointer: Optional[BaseCheckpointSaver[Any]] = None
+) -> CompiledStateGraph:
+    graph = StateGraph(LLMSubject)
+
+    if asynchronous:
+        graph.add_node("summarize", asummarize)
+        graph.add_node("reduce", areduce)
+        graph.add_node("price_target", aprice_target)
+        graph.add_node("get_analysis", aget_analysis)
+    else:
+        graph.add_node("summarize", summarize)
+        graph.add_node("reduce", reduce)
+        graph.add_node("price_target", price_target)
+        graph.add_node("get_analysis", get_analysis)
+    graph.add_edge(START, "summarize")
+    graph.add_edge(START, "price_target")
+    graph.add_conditional_edges(
+        "summarize", has_more_articles, {True: "summarize", False: "reduce"}
+    )
+    graph.add_edge(["reduce", "price_target"], "get_analysis")
+
+    graph.set_finish_point("get_analysis")
+
+    return graph.compile(checkpointer=checkpointer)
+
+
+def invoke_summarize_agent(
+    subject: LLMSubject,
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    checkpointer: Optional[BaseCheckpointSaver[Any]] = None,
+    thread_id: Optional[str] = None,
+) -> Subject:
+    graph = summarize_agent(checkpointer=checkpointer)
+    config = agent_config(callbacks, thread_id if checkpointer else None)
+    input_: Optional[LLMSubject] = subject
+    if checkpointer:
+        state = graph.get_state(config)
+        if state.values and not state.next:
+            logger.info(f"Restoring finished {subject.symbol} from {thread_id}.")
+            return Subject.model_validate(state.values)
+        if state.next:
+            logger.info(f"Resuming {subject.symbol} from checkpoint {thread_id}.")
+            input_ = None
+    result = graph.invoke(input_, config=config)
+    return Subject.model_validate(result)
+
+
+async def ainvoke_summarize_agent(
+    subject: LLMSubject,
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    checkpointer: Optional[BaseCheckpointSaver[Any]] = None,
+    thread_id: Optional[str] = None,
+) -> Subject:
+    graph = summarize_agent(asynchronous=True, checkpointer=checkpointer)
+    config = agent_config(callbacks, thread_id if checkpointer else None)
+    input_: Optional[LLMSubject] = subject
+    if checkpointer:
+        state = await graph.aget_state(config)
+        if state.values and not state.next:
+            logger.info(f"Restoring finished {subject.symbol} from {thread_id}.")
+            return Subject.model_validate(state.values)
+        if state.next:
+            logger.info(f"Resuming {subject.symbol} from checkpoint {thread_id}.")
+            input_ = None
+    result = await graph.ainvoke(input_, config=config)
+    return Subject.model_validate(result)
@@ -1,6 +1,31 @@
-from typing import Optional
+import hashlib
+import urllib.parse
+from datetime import datetime
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+TRACKING_PARAMETERS = ("utm_", "guccounter", "guce_")
+
+
+def canonical_url(url: str) -> str:
+    parts = urllib.parse.urlsplit(url.strip())
+    query = urllib.parse.urlencode(
+        sorted(
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(parts.query)
+            if not key.lower().startswith(TRACKING_PARAMETERS)
+        )
+    )
+    return urllib.parse.urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower().removeprefix("www."),
+            parts.path.rstrip("/"),
+            query,
+            "",
+        )
+    )
 
 
 class Summary(BaseModel):
@@ -15,6 +40,15 @@ class BaseArticle(Summary):
     def __hash__(self) -> int:
         return hash((self.url, self.source))
 
+    def key(self) -> str:
+        if self.url and urllib.parse.urlsplit(self.url).scheme in ("http", "https"):
+            return canonical_url(self.url)
+        return f"{self.source}|{self.url}|{self.content}"
+
+    @property
+    def url_hash(self) -> str:
+        return hashlib.sha256(self.key().encode("utf-8")).hexdigest()
+
 
 class News(BaseArticle): ...
 
@@ -22,4 +56,36 @@ class News(BaseArticle): ...
 class NewsSummary(BaseArticle): ...
 
 
-class PriceTargetNews(BaseArticle): ...
+class PriceTargetNews(BaseArticle):
+    high_price_target: Optional[float] = None
+    low_price_target: Optional[float] = None
+    fair_value: Optional[float] = None
+
+    def key(self) -> str:
+        return f"{self.source}|{self.url}|{self.content}"
+
+    @property
+    def structured(self) -> bool:
+        return self.high_price_target is not None or self.low_price_target is not None
+
+
+class ArticleSummary(BaseModel):
+    url: str
+    summary: str
+
+
+class ArticleSummaries(BaseModel):
+    summaries: List[ArticleSummary] = Field(default_factory=list)
+
+    def by_url(self) -> Dict[Optional[str], str]:
+        return {s.url: s.summary for s in self.summaries if s.summary}
+
+
+class TextSearchHit(BaseModel):
+    symbol: str
+    date: datetime
+    kind: str
+    url: Optional[str] = None
+    title: Optional[str] = None
+    snippet: str
+    score: float
@@ -0,0 +1,75 @@
+import logging
+from typing import Dict, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from tickermood.relevance import tokenize
+from tickermood.tokens import SENTENCE_SEPARATOR, count_tokens
+
+logger = logging.getLogger(__name__)
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def tfidf_matrix(sentences: List[List[str]]) -> NDArray[np.float64]:
+    vocabulary: Dict[str, int] = {}
+    for tokens in sentences:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    counts = np.zeros((len(sentences), len(vocabulary)), dtype=np.float64)
+    for row, tokens in enumerate(sentences):
+        for token in tokens:
+            counts[row, vocabulary[token]] += 1
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    weights = np.log1p(counts) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    normalized: NDArray[np.float64] = weights / np.where(norms == 0, 1, norms)
+    return normalized
+
+
+def textrank(weights: NDArray[np.float64]) -> NDArray[np.float64]:
+    similarity = weights @ weights.T
+    np.fill_diagonal(similarity, 0)
+    totals = similarity.sum(axis=1, keepdims=True)
+    transition = np.divide(
+        similarity,
+        totals,
+        out=np.full_like(similarity, 1 / len(weights)),
+        where=totals != 0,
+    )
+    teleport = (1 - DAMPING) / len(weights)
+    scores: NDArray[np.float64] = np.full(len(weights), 1 / len(weights))
+    for _ in range(MAX_ITERATIONS):
+        updated: NDArray[np.float64] = teleport + DAMPING * transition.T @ scores
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def compress_text(text: str, max_tokens: int, model_name: str, terms: List[str]) -> str:
+    if count_tokens(text, model_name) <= max_tokens:
+        return text
+    sentences = [s.strip() for s in SENTENCE_SEPARATOR.split(text) if s.strip()]
+    if len(sentences) <= 1:
+        return text
+    tokens = [tokenize(sentence) for sentence in sentences]
+    scores = textrank(tfidf_matrix(tokens))
+    mentions = np.array([any(token in terms for token in t) for t in tokens], dtype=int)
+    order = np.lexsort((-scores, -mentions))
+    selected: List[int] = []
+    budget = max_tokens
+    for index in order:
+        sentence_tokens = count_tokens(f"{sentences[index]} ", model_name)
+        if sentence_tokens > budget:
+            continue
+        selected.append(int(index))
+        budget -= sentence_tokens
+    compressed = " ".join(sentences[index] for index in sorted(selected))
+    logger.debug(
+        f"Compressed article from {len(sentences)} to {len(selected)} sentences."
+    )
+    return compressed or text
@@ -1,5 +1,6 @@
 import os
 from logging.config import fileConfig
+from typing import Any, Optional
 
 
 from sqlalchemy import engine_from_config
@@ -9,6 +10,7 @@ from alembic import context
 from sqlmodel import SQLModel
 
 from tickermood.database.schemas import *  # noqa: F403
+from tickermood.database.schemas import ARTICLE_FTS_TABLE
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -25,6 +27,11 @@ config = context.config
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+
+def include_name(name: Optional[str], type_: str, parent_names: Any) -> bool:
+    return not (type_ == "table" and name and name.startswith(ARTICLE_FTS_TABLE))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -71,7 +78,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata, render_as_batch=True
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,171 @@
+"""Backfill article tables from subject JSON columns.
+
+Revision ID: 9a4d2c7e1f3b
+Revises: 2e72c6efcc82
+Create Date: 2026-10-19 18:04:51.204417
+
+"""
+
+import hashlib
+import json
+import urllib.parse
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d2c7e1f3b"
+down_revision: Union[str, None] = "2e72c6efcc82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BASE_FIELDS = ["content", "url", "source", "title"]
+PRICE_TARGET_FIELDS = ["high_price_target", "low_price_target", "fair_value"]
+ARTICLE_KINDS: Dict[str, List[str]] = {
+    "news": BASE_FIELDS,
+    "news_summary": BASE_FIELDS,
+    "price_target_news": BASE_FIELDS + PRICE_TARGET_FIELDS,
+}
+TRACKING_PARAMETERS = ("utm_", "guccounter", "guce_")
+ARTICLE_COLUMNS = [
+    "url_hash",
+    "url",
+    "source",
+    "title",
+    "content",
+    "high_price_target",
+    "low_price_target",
+    "fair_value",
+]
+SUMMARY_COLUMNS = ["url_hash", "symbol", "date", "url", "source", "title", "content"]
+LINK_COLUMNS = ["date", "symbol", "kind", "url_hash", "position"]
+
+
+def _canonical_url(url: str) -> str:
+    parts = urllib.parse.urlsplit(url.strip())
+    query = urllib.parse.urlencode(
+        sorted(
+            (key, value)
+            for key, value in urllib.parse.parse_qsl(parts.query)
+            if not key.lower().startswith(TRACKING_PARAMETERS)
+        )
+    )
+    return urllib.parse.urlunsplit(
+        (
+            parts.scheme.lower(),
+            parts.netloc.lower().removeprefix("www."),
+            parts.path.rstrip("/"),
+            query,
+            "",
+        )
+    )
+
+
+def _url_hash(kind: str, article: Dict[str, Any]) -> str:
+    url = article["url"]
+    if (
+        kind != "price_target_news"
+        and url
+        and urllib.parse.urlsplit(url).scheme in ("http", "https")
+    ):
+        key = _canonical_url(url)
+    else:
+        key = f"{article['source']}|{url}|{article['content']}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _article(kind: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: item.get(field) for field in ARTICLE_KINDS[kind]}
+
+
+def _insert(prefix: str, table: str, columns: List[str]) -> sa.TextClause:
+    return sa.text(
+        f"INSERT OR {prefix} INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join(f':{c}' for c in columns)})"
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    subjects = bind.execute(
+        sa.text(
+            "SELECT date, symbol, news, news_summary, price_target_news FROM subject"
+        )
+    ).mappings()
+    articles: List[Dict[str, Any]] = []
+    summaries: List[Dict[str, Any]] = []
+    links: List[Dict[str, Any]] = []
+    for subject in subjects:
+        for kind in ARTICLE_KINDS:
+            for position, item in enumerate(json.loads(subject[kind] or "[]")):
+                article = _article(kind, item)
+                url_hash = _url_hash(kind, article)
+                row = {c: article.get(c) for c in ARTICLE_COLUMNS} | {
+                    "url_hash": url_hash,
+                    "symbol": subject["symbol"],
+                    "date": subject["date"],
+                }
+                (summaries if kind == "news_summary" else articles).append(row)
+                links.append(
+                    {
+                        "date": subject["date"],
+                        "symbol": subject["symbol"],
+                        "kind": kind,
+                        "url_hash": url_hash,
+                        "position": position,
+                    }
+                )
+    if articles:
+        bind.execute(_insert("REPLACE", "article", ARTICLE_COLUMNS), articles)
+    if summaries:
+        summary_rows = [{c: s[c] for c in SUMMARY_COLUMNS} for s in summaries]
+        bind.execute(
+            _insert("IGNORE", "article_summary", SUMMARY_COLUMNS), summary_rows
+        )
+    if links:
+        bind.execute(_insert("IGNORE", "subject_article", LINK_COLUMNS), links)
+    bind.execute(
+        sa.text(
+            "UPDATE subject SET news = NULL, news_summary = NULL, price_target_news = NULL"
+        )
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    links = bind.execute(
+        sa.text(
+            "SELECT l.date, l.symbol, l.kind, "
+            "COALESCE(a.url, s.url) AS url, COALESCE(a.source, s.source) AS source, "
+            "COALESCE(a.title, s.title) AS title, "
+            "COALESCE(a.content, s.content) AS content, "
+            "a.high_price_target, a.low_price_target, a.fair_value "
+            "FROM subject_article l "
+            "LEFT JOIN article a ON l.kind != 'news_summary' AND a.url_hash = l.url_hash "
+            "LEFT JOIN article_summary s ON l.kind = 'news_summary' "
+            "AND s.url_hash = l.url_hash AND s.symbol = l.symbol AND s.date = l.date "
+            "ORDER BY l.date, l.symbol, l.kind, l.position"
+        )
+    ).mappings()
+    subjects: Dict[Any, Dict[str, List[Dict[str, Any]]]] = defaultdict(
+        lambda: {kind: [] for kind in ARTICLE_KINDS}
+    )
+    for link in links:
+        if link["content"] is None:
+            continue
+        subjects[(link["date"], link["symbol"])][link["kind"]].append(
+            _article(link["kind"], dict(link))
+        )
+    for (date, symbol), columns in subjects.items():
+        bind.execute(
+            sa.text(
+                "UPDATE subject SET news = :news, news_summary = :news_summary, "
+                "price_target_news = :price_target_news "
+                "WHERE date = :date AND symbol = :symbol"
+            ),
+            {k: json.dumps(v) for k, v in columns.items()}
+            | {"date": date, "symbol": symbol},
+        )
+    bind.execute(sa.text("DELETE FROM subject_article"))
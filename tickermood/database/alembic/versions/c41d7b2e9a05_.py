@@ -0,0 +1,87 @@
+"""Full-text index over article and summary content.
+
+Revision ID: c41d7b2e9a05
+Revises: 46f6882e4d8a
+Create Date: 2026-10-19 19:12:08.318244
+
+"""
+
+import zlib
+from typing import Any, Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "c41d7b2e9a05"
+down_revision: Union[str, None] = "46f6882e4d8a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+ARTICLE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5("
+    "url_hash UNINDEXED, kind UNINDEXED, url UNINDEXED, title, content, "
+    "symbol UNINDEXED, date UNINDEXED, tokenize='porter unicode61')"
+)
+ZSTD_HEADER = b"S1"
+ZLIB_HEADER = b"Z1"
+
+
+def _zstd() -> Optional[Any]:
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        return None
+
+
+def _decompress(value: bytes) -> str:
+    header, data = value[:2], value[2:]
+    if header == ZSTD_HEADER:
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read this database.")
+        return str(zstd.ZstdDecompressor().decompress(data).decode("utf-8"))
+    if header == ZLIB_HEADER:
+        return zlib.decompress(data).decode("utf-8")
+    return value.decode("utf-8")
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    op.execute(ARTICLE_FTS_DDL)
+    rows = bind.execute(
+        sa.text(
+            "SELECT a.url_hash, 'news' AS kind, a.url, a.title, a.content, "
+            "NULL AS symbol, NULL AS date "
+            "FROM article a WHERE a.url_hash IN "
+            "(SELECT url_hash FROM subject_article WHERE kind = 'news') "
+            "UNION ALL "
+            "SELECT s.url_hash, 'news_summary' AS kind, s.url, s.title, s.content, "
+            "s.symbol, s.date FROM article_summary s"
+        )
+    ).mappings()
+    documents = [
+        dict(row)
+        | {
+            "content": (
+                row["content"]
+                if isinstance(row["content"], str)
+                else _decompress(row["content"])
+            )
+        }
+        for row in rows
+    ]
+    if documents:
+        bind.execute(
+            sa.text(
+                "INSERT INTO article_fts "
+                "(url_hash, kind, url, title, content, symbol, date) "
+                "VALUES (:url_hash, :kind, :url, :title, :content, :symbol, :date)"
+            ),
+            documents,
+        )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS article_fts")
@@ -0,0 +1,60 @@
+import logging
+import zlib
+from functools import lru_cache
+from typing import Any, Optional
+
+from sqlalchemy import Dialect, LargeBinary, TypeDecorator
+
+logger = logging.getLogger(__name__)
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+ZSTD_HEADER = b"S1"
+ZLIB_HEADER = b"Z1"
+
+
+@lru_cache(maxsize=1)
+def _zstd() -> Optional[Any]:
+    try:
+        import zstandard
+
+        return zstandard
+    except ImportError:
+        logger.debug("zstandard is not installed, using zlib.")
+        return None
+
+
+def compress(text: str) -> bytes:
+    data = text.encode("utf-8")
+    zstd = _zstd()
+    if zstd is not None:
+        return ZSTD_HEADER + bytes(zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(data))
+    return ZLIB_HEADER + zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(value: bytes) -> str:
+    header, data = value[:2], value[2:]
+    if header == ZSTD_HEADER:
+        zstd = _zstd()
+        if zstd is None:
+            raise RuntimeError("zstandard is required to read this database.")
+        return str(zstd.ZstdDecompressor().decompress(data).decode("utf-8"))
+    if header == ZLIB_HEADER:
+        return zlib.decompress(data).decode("utf-8")
+    return value.decode("utf-8")
+
+
+class CompressedText(TypeDecorator[str]):
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(
+        self, value: Optional[str], dialect: Dialect
+    ) -> Optional[bytes]:
+        return None if value is None else compress(value)
+
+    def process_result_value(
+        self, value: Optional[Any], dialect: Dialect
+    ) -> Optional[str]:
+        if value is None or isinstance(value, str):
+            return value
+        return decompress(value)
@@ -1,16 +1,130 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
 from functools import cached_property
 from pathlib import Path
-from typing import Any, TYPE_CHECKING
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+import pandas as pd
 
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import Engine, create_engine, insert
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Engine,
+    Table,
+    and_,
+    bindparam,
+    column as sa_column,
+    create_engine,
+    delete,
+    event,
+    exists,
+    insert,
+    func,
+    literal_column,
+    null,
+    or_,
+    select as sa_select,
+    table as sa_table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.sql.expression import ColumnClause, ColumnElement, TableClause
 from sqlmodel import Session, select
 
 
+from tickermood.articles import News, PriceTargetNews, TextSearchHit
 from tickermood.database.scripts.upgrade import upgrade
+from tickermood.embeddings import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_MODEL,
+    EmbeddingKind,
+    EmbeddingMatch,
+    embed_texts,
+    from_blobs,
+    to_blob,
+    top_k,
+)
+from tickermood.retention import (
+    ARTICLE_KINDS,
+    COMPACTION_BATCH_SIZE,
+    SUMMARY_COLUMNS,
+    SUMMARY_KINDS,
+    VACUUM_PAGES,
+    VACUUM_STEP_PAGES,
+    CompactionReport,
+    RetentionPolicy,
+)
+from tickermood.export import EXPORT_CHUNK_SIZE, export_columns, write_frames
+from tickermood.types import ExportFormat
+from tickermood.usage import LLMUsage
 
 if TYPE_CHECKING:
-    from tickermood.subject import Subject
+    from tickermood.articles import BaseArticle
+    from tickermood.database.schemas import ArticleEmbeddingORM
+    from tickermood.subject import Subject, SubjectSnapshot
+
+logger = logging.getLogger(__name__)
+WriteRequest = Tuple["Subject", List[LLMUsage], List[Dict[str, Any]], "Future[None]"]
+ARTICLE_FIELDS = ("news", "news_summary", "price_target_news")
+TEXT_SEARCH_FIELDS = ("news", "news_summary")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,
+    "busy_timeout": 30000,
+    "temp_store": "MEMORY",
+}
+INCREMENTAL_AUTO_VACUUM = 2
+_engines: Dict[Path, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def fts_query(query: str) -> str:
+    return " ".join('"' + token.replace('"', '""') + '"' for token in query.split())
+
+
+def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma} = {value}")
+    cursor.close()
+
+
+def get_engine(database_path: Path, no_migration: bool = False) -> Engine:
+    path = Path(database_path).resolve()
+    with _engines_lock:
+        engine = _engines.get(path)
+        if engine is None or not path.exists():
+            if engine is not None:
+                engine.dispose()
+            database_url = f"sqlite:///{path}"
+            upgrade(database_url, no_migration=no_migration)
+            engine = create_engine(database_url)
+            event.listen(engine, "connect", set_sqlite_pragmas)
+            _engines[path] = engine
+        return engine
+
+
+def dispose_engines() -> None:
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
 
 
 class TickerMoodDb(BaseModel):
@@ -20,28 +134,127 @@ class TickerMoodDb(BaseModel):
 
     @cached_property
     def _engine(self) -> Engine:
-        database_url = f"sqlite:///{Path(self.database_path)}"
-        upgrade(database_url, no_migration=self.no_migration)
-        engine = create_engine(database_url)
-        return engine
+        return get_engine(self.database_path, no_migration=self.no_migration)
 
     def model_post_init(self, __context: Any) -> None:
         self._engine  # noqa: B018
 
     def write(self, subject: "Subject") -> None:
-        from tickermood.database.schemas import SubjectORM
+        self.write_many([subject])
+
+    def write_many(self, subjects: List["Subject"]) -> None:
+        from tickermood.database.schemas import (
+            SubjectORM,
+            ArticleORM,
+            ArticleSummaryORM,
+            SubjectArticleORM,
+            ARTICLE_FTS_TABLE,
+        )
 
+        subjects = list({(s.date, s.symbol): s for s in subjects}.values())
+        if not subjects:
+            return
+        articles = [
+            PriceTargetNews.model_validate(a.model_dump()).model_dump()
+            | {"url_hash": a.url_hash}
+            for s in subjects
+            for a in [*s.news, *s.price_target_news]
+        ]
+        summaries = [
+            n.model_dump()
+            | {"url_hash": n.url_hash, "symbol": s.symbol, "date": s.date}
+            for s in subjects
+            for n in s.news_summary
+        ]
+        links = [
+            {
+                "date": s.date,
+                "symbol": s.symbol,
+                "kind": kind,
+                "url_hash": article.url_hash,
+                "position": position,
+            }
+            for s in subjects
+            for kind in ARTICLE_FIELDS
+            for position, article in enumerate(getattr(s, kind))
+        ]
+        documents = {
+            (article.url_hash, kind, *owner): {
+                "url_hash": article.url_hash,
+                "kind": kind,
+                "url": article.url,
+                "title": article.title,
+                "content": article.content,
+                "symbol": owner[0],
+                "date": owner[1],
+            }
+            for s in subjects
+            for kind in TEXT_SEARCH_FIELDS
+            for owner in [
+                (s.symbol, s.date) if kind == "news_summary" else (None, None)
+            ]
+            for article in getattr(s, kind)
+        }
         with Session(self._engine) as session:
-            stmt = (
-                insert(SubjectORM)
-                .prefix_with("OR REPLACE")
-                .values([subject.model_dump()])
+            connection = session.connection()
+            connection.execute(
+                insert(SubjectORM).prefix_with("OR REPLACE"),
+                [s.model_dump(exclude=set(ARTICLE_FIELDS)) for s in subjects],
             )
-            session.exec(stmt)  # type: ignore
+            if articles:
+                connection.execute(
+                    insert(ArticleORM).prefix_with("OR REPLACE"), articles
+                )
+            if summaries:
+                connection.execute(
+                    insert(ArticleSummaryORM).prefix_with("OR REPLACE"), summaries
+                )
+            connection.execute(
+                delete(SubjectArticleORM).where(
+                    tuple_(SubjectArticleORM.date, SubjectArticleORM.symbol).in_(  # type: ignore
+                        [(s.date, s.symbol) for s in subjects]
+                    )
+                )
+            )
+            if links:
+                connection.execute(
+                    insert(SubjectArticleORM).prefix_with("OR IGNORE"), links
+                )
+            news_hashes = list({h for h, kind, *_ in documents if kind == "news"})
+            if news_hashes:
+                connection.execute(
+                    text(
+                        f"DELETE FROM {ARTICLE_FTS_TABLE} "
+                        "WHERE kind = 'news' AND url_hash IN :hashes"
+                    ).bindparams(bindparam("hashes", expanding=True)),
+                    {"hashes": news_hashes},
+                )
+            connection.execute(
+                text(
+                    f"DELETE FROM {ARTICLE_FTS_TABLE} WHERE kind = 'news_summary' "
+                    "AND symbol = :symbol AND date = :date"
+                ).bindparams(bindparam("date", type_=DateTime())),
+                [{"symbol": s.symbol, "date": s.date} for s in subjects],
+            )
+            if documents:
+                connection.execute(
+                    text(
+                        f"INSERT INTO {ARTICLE_FTS_TABLE} "
+                        "(url_hash, kind, url, title, content, symbol, date) "
+                        "VALUES (:url_hash, :kind, :url, :title, :content, "
+                        ":symbol, :date)"
+                    ).bindparams(bindparam("date", type_=DateTime())),
+                    list(documents.values()),
+                )
             session.commit()
 
     def load(self, subject: "Subject") -> "Subject":
-        from tickermood.database.schemas import SubjectORM
+        from tickermood.database.schemas import (
+            SubjectORM,
+            ArticleORM,
+            ArticleSummaryORM,
+            SubjectArticleORM,
+        )
         from tickermood.subject import Subject
 
         with Session(self._engine) as session:
@@ -54,4 +267,597 @@ class TickerMoodDb(BaseModel):
             result = session.exec(stmt).first()
             if result is None:
                 raise ValueError(f"No data found for symbol: {subject.symbol}")
-            return Subject.model_validate(result.model_dump())
+            data = result.model_dump()
+            links = session.exec(
+                select(SubjectArticleORM)
+                .where(
+                    SubjectArticleORM.date == result.date,
+                    SubjectArticleORM.symbol == result.symbol,
+                )
+                .order_by(
+                    SubjectArticleORM.kind, SubjectArticleORM.position  # type: ignore
+                )
+            ).all()
+            orms: Dict[str, Any] = {
+                "news": ArticleORM,
+                "news_summary": ArticleSummaryORM,
+                "price_target_news": ArticleORM,
+            }
+            for kind, orm in orms.items():
+                hashes = [link.url_hash for link in links if link.kind == kind]
+                if not hashes:
+                    data[kind] = data[kind] or []
+                    continue
+                query = select(orm).where(orm.url_hash.in_(hashes))
+                if orm is ArticleSummaryORM:
+                    query = query.where(
+                        ArticleSummaryORM.symbol == result.symbol,
+                        ArticleSummaryORM.date == result.date,
+                    )
+                rows = {row.url_hash: row.model_dump() for row in session.exec(query)}
+                data[kind] = [rows[h] for h in hashes if h in rows]
+            return Subject.model_validate(data)
+
+    def _snapshot_columns(self) -> Tuple[Table, List[Column[Any]]]:
+        from tickermood.database.schemas import SubjectORM
+        from tickermood.subject import SubjectSnapshot
+
+        table: Table = SubjectORM.__table__  # type: ignore
+        return table, [
+            table.c[name] for name in SubjectSnapshot.model_fields if name in table.c
+        ]
+
+    def latest(self, symbols: Optional[List[str]] = None) -> List["SubjectSnapshot"]:
+        from tickermood.subject import SubjectSnapshot
+
+        table, columns = self._snapshot_columns()
+        latest = sa_select(
+            table.c.symbol, func.max(table.c.date).label("date")
+        ).group_by(table.c.symbol)
+        if symbols:
+            latest = latest.where(table.c.symbol.in_(symbols))
+        subquery = latest.subquery()
+        stmt = (
+            sa_select(*columns)
+            .join(
+                subquery,
+                and_(
+                    table.c.symbol == subquery.c.symbol,
+                    table.c.date == subquery.c.date,
+                ),
+            )
+            .order_by(table.c.symbol)
+        )
+        with self._engine.connect() as connection:
+            return [
+                SubjectSnapshot.model_validate(dict(row))
+                for row in connection.execute(stmt).mappings()
+            ]
+
+    def latest_dates(self, symbols: List[str]) -> Dict[str, datetime]:
+        table, _ = self._snapshot_columns()
+        stmt = (
+            sa_select(table.c.symbol, func.max(table.c.date))
+            .where(
+                table.c.symbol.in_(symbols),
+                or_(
+                    table.c.consensus.is_not(None),
+                    func.json_extract(table.c.summary, "$").is_not(None),
+                ),
+            )
+            .group_by(table.c.symbol)
+        )
+        with self._engine.connect() as connection:
+            return dict(connection.execute(stmt).tuples().all())
+
+    def history(
+        self, symbol: str, since: Optional[datetime] = None
+    ) -> List["SubjectSnapshot"]:
+        from tickermood.subject import SubjectSnapshot
+
+        table, columns = self._snapshot_columns()
+        stmt = (
+            sa_select(*columns).where(table.c.symbol == symbol).order_by(table.c.date)
+        )
+        if since:
+            stmt = stmt.where(table.c.date >= since)
+        with self._engine.connect() as connection:
+            return [
+                SubjectSnapshot.model_validate(dict(row))
+                for row in connection.execute(stmt).mappings()
+            ]
+
+    def snapshot_frames(
+        self,
+        symbols: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        include_text: bool = False,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        table, _ = self._snapshot_columns()
+        stmt = sa_select(
+            *[
+                (
+                    func.json_extract(table.c[name], "$.content").label(name)
+                    if name == "summary"
+                    else table.c[name]
+                )
+                for name in export_columns(include_text)
+            ]
+        ).order_by(table.c.symbol, table.c.date)
+        if symbols:
+            stmt = stmt.where(table.c.symbol.in_(symbols))
+        if since:
+            stmt = stmt.where(table.c.date >= since)
+        with self._engine.connect() as connection:
+            yield from pd.read_sql(
+                stmt, connection, chunksize=chunk_size, parse_dates=["date"]
+            )
+
+    def export(  # noqa: PLR0913, PLR0917
+        self,
+        path: Path,
+        format: Optional[ExportFormat] = None,
+        symbols: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        include_text: bool = False,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+    ) -> int:
+        frames = self.snapshot_frames(
+            symbols=symbols,
+            since=since,
+            include_text=include_text,
+            chunk_size=chunk_size,
+        )
+        return write_frames(frames, path, format=format, include_text=include_text)
+
+    def search_text(
+        self,
+        query: str,
+        k: int = 20,
+        symbols: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        raw: bool = False,
+    ) -> List[TextSearchHit]:
+        from tickermood.database.schemas import ARTICLE_FTS_TABLE
+
+        match = query if raw else fts_query(query)
+        if not match.strip():
+            return []
+        filters = [
+            "l.url_hash = hits.url_hash",
+            "l.kind = hits.kind",
+            "(hits.symbol IS NULL OR (l.symbol = hits.symbol AND l.date = hits.date))",
+        ]
+        parameters: Dict[str, Any] = {"query": match, "k": k}
+        if symbols:
+            filters.append("l.symbol IN :symbols")
+            parameters["symbols"] = symbols
+        if since:
+            filters.append("l.date >= :since")
+            parameters["since"] = since
+        stmt = text(
+            f"WITH hits AS MATERIALIZED ("
+            f"SELECT url_hash, kind, url, title, "
+            f"snippet({ARTICLE_FTS_TABLE}, 4, '[', ']', '...', 12) AS snippet, "
+            f"-bm25({ARTICLE_FTS_TABLE}) AS score, symbol, date "
+            f"FROM {ARTICLE_FTS_TABLE} WHERE {ARTICLE_FTS_TABLE} MATCH :query) "
+            "SELECT l.symbol, MAX(l.date) AS date, hits.kind, hits.url, hits.title, "
+            "hits.snippet, hits.score FROM hits "
+            f"JOIN subject_article l ON {' AND '.join(filters)} "
+            "GROUP BY hits.url_hash, hits.kind, l.symbol "
+            "ORDER BY hits.score DESC LIMIT :k"
+        )
+        if symbols:
+            stmt = stmt.bindparams(bindparam("symbols", expanding=True))
+        with self._engine.connect() as connection:
+            return [
+                TextSearchHit.model_validate(dict(row))
+                for row in connection.execute(stmt, parameters).mappings()
+            ]
+
+    def has_article(self, url: str) -> bool:
+        from tickermood.database.schemas import ArticleORM
+
+        url_hash = News(url=url, source="", content="").url_hash
+        with Session(self._engine) as session:
+            stmt = select(ArticleORM.url_hash).where(ArticleORM.url_hash == url_hash)
+            return session.exec(stmt).first() is not None
+
+    def write_usage(self, subject: "Subject", usage: List[LLMUsage]) -> None:
+        from tickermood.database.schemas import LLMUsageORM
+
+        if not usage:
+            return
+        with Session(self._engine) as session:
+            stmt = (
+                insert(LLMUsageORM)
+                .prefix_with("OR REPLACE")
+                .values(
+                    [
+                        u.model_dump()
+                        | {"symbol": subject.symbol, "date": subject.date}
+                        for u in usage
+                    ]
+                )
+            )
+            session.exec(stmt)  # type: ignore
+            session.commit()
+
+    def usage_report(self, symbols: Optional[List[str]] = None) -> List[LLMUsage]:
+        from tickermood.database.schemas import LLMUsageORM
+
+        with Session(self._engine) as session:
+            stmt = select(  # type: ignore
+                LLMUsageORM.node,
+                LLMUsageORM.model_name,
+                func.sum(LLMUsageORM.calls).label("calls"),
+                func.sum(LLMUsageORM.input_tokens).label("input_tokens"),
+                func.sum(LLMUsageORM.output_tokens).label("output_tokens"),
+                func.sum(LLMUsageORM.latency).label("latency"),
+                func.sum(LLMUsageORM.cache_hits).label("cache_hits"),
+            ).group_by(LLMUsageORM.node, LLMUsageORM.model_name)
+            if symbols:
+                stmt = stmt.where(LLMUsageORM.symbol.in_(symbols))  # type: ignore
+            return [
+                LLMUsage.model_validate(dict(row._mapping))
+                for row in session.exec(stmt)
+            ]
+
+    def embedding_rows(
+        self,
+        subject: "Subject",
+        model_name: str = EMBEDDING_MODEL,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ) -> List[Dict[str, Any]]:
+        from tickermood.database.schemas import ArticleEmbeddingORM
+
+        articles: List[Tuple[EmbeddingKind, BaseArticle]] = [
+            *(("news", n) for n in subject.news),
+            *(("news_summary", n) for n in subject.news_summary),
+        ]
+        articles = [(kind, a) for kind, a in articles if a.url and a.content]
+        if not articles:
+            return []
+        with Session(self._engine) as session:
+            existing = set(
+                session.exec(
+                    select(ArticleEmbeddingORM.url, ArticleEmbeddingORM.kind).where(
+                        ArticleEmbeddingORM.model_name == model_name,
+                        ArticleEmbeddingORM.url.in_(  # type: ignore
+                            [a.url for _, a in articles]
+                        ),
+                    )
+                ).all()
+            )
+        missing = [(k, a) for k, a in articles if (a.url, k) not in existing]
+        if not missing:
+            return []
+        vectors = embed_texts(
+            [a.content for _, a in missing], model_name, batch_size=batch_size
+        )
+        return [
+            {
+                "url": article.url,
+                "kind": kind,
+                "model_name": model_name,
+                "symbol": subject.symbol,
+                "date": subject.date,
+                "dimension": vector.shape[0],
+                "vector": to_blob(vector),
+            }
+            for (kind, article), vector in zip(missing, vectors, strict=True)
+        ]
+
+    def write_embedding_rows(self, rows: List[Dict[str, Any]]) -> None:
+        from tickermood.database.schemas import ArticleEmbeddingORM
+
+        if not rows:
+            return
+        with Session(self._engine) as session:
+            stmt = insert(ArticleEmbeddingORM).prefix_with("OR REPLACE").values(rows)
+            session.exec(stmt)  # type: ignore
+            session.commit()
+
+    def write_embeddings(
+        self,
+        subject: "Subject",
+        model_name: str = EMBEDDING_MODEL,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+    ) -> int:
+        rows = self.embedding_rows(subject, model_name, batch_size=batch_size)
+        self.write_embedding_rows(rows)
+        return len(rows)
+
+    def _embeddings(
+        self,
+        model_name: str,
+        symbols: Optional[List[str]] = None,
+        kind: Optional[EmbeddingKind] = None,
+        exclude_urls: Optional[Set[str]] = None,
+    ) -> Sequence["ArticleEmbeddingORM"]:
+        from tickermood.database.schemas import ArticleEmbeddingORM
+
+        with Session(self._engine) as session:
+            stmt = select(ArticleEmbeddingORM).where(
+                ArticleEmbeddingORM.model_name == model_name
+            )
+            if symbols:
+                stmt = stmt.where(ArticleEmbeddingORM.symbol.in_(symbols))  # type: ignore
+            if kind:
+                stmt = stmt.where(ArticleEmbeddingORM.kind == kind)
+            if exclude_urls:
+                stmt = stmt.where(
+                    ArticleEmbeddingORM.url.not_in(exclude_urls)  # type: ignore
+                )
+            return session.exec(stmt).all()
+
+    def similar(
+        self,
+        query: str,
+        k: int = 5,
+        symbols: Optional[List[str]] = None,
+        kind: Optional[EmbeddingKind] = None,
+        model_name: str = EMBEDDING_MODEL,
+    ) -> List[EmbeddingMatch]:
+        rows = self._embeddings(model_name, symbols=symbols, kind=kind)
+        if not rows:
+            return []
+        matrix = from_blobs([r.vector for r in rows], rows[0].dimension)
+        query_vector = embed_texts([query], model_name)[0]
+        return [
+            EmbeddingMatch.model_validate(rows[i].model_dump() | {"score": score})
+            for i, score in top_k(query_vector, matrix, k)
+        ]
+
+    def duplicates(
+        self,
+        news: List["News"],
+        threshold: float = 0.95,
+        symbols: Optional[List[str]] = None,
+        model_name: str = EMBEDDING_MODEL,
+    ) -> List["News"]:
+        news = [n for n in news if n.content]
+        rows = self._embeddings(
+            model_name,
+            symbols=symbols,
+            kind="news",
+            exclude_urls={n.url for n in news if n.url},
+        )
+        if not rows or not news:
+            return []
+        matrix = from_blobs([r.vector for r in rows], rows[0].dimension)
+        vectors = embed_texts([n.content for n in news], model_name)
+        duplicated = []
+        for article, vector in zip(news, vectors, strict=True):
+            (index, score), *_ = top_k(vector, matrix, 1)
+            if score >= threshold:
+                logger.info(f"Article {article.url} duplicates {rows[index].url}.")
+                duplicated.append(article)
+        return duplicated
+
+    def _in_batches(
+        self,
+        table: TableClause,
+        condition: ColumnElement[bool],
+        batch_size: int,
+        values: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        rowid: ColumnClause[Any] = literal_column("rowid")
+        batch = (
+            sa_select(rowid)
+            .select_from(table)
+            .where(condition)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(table).where(rowid.in_(batch)).values(values)
+            if values
+            else delete(table).where(rowid.in_(batch))
+        )
+        total = 0
+        while True:
+            with self._engine.begin() as connection:
+                count = connection.execute(stmt).rowcount
+            total += count
+            if count < batch_size:
+                return total
+
+    def compact(
+        self,
+        policy: Optional[RetentionPolicy] = None,
+        batch_size: int = COMPACTION_BATCH_SIZE,
+        vacuum: bool = True,
+        vacuum_pages: int = VACUUM_PAGES,
+    ) -> CompactionReport:
+        from tickermood.database.schemas import (
+            SubjectORM,
+            ArticleEmbeddingORM,
+            ArticleORM,
+            ArticleSummaryORM,
+            SubjectArticleORM,
+            ARTICLE_FTS_TABLE,
+        )
+
+        policy = policy or RetentionPolicy()
+        report = CompactionReport()
+        subjects: Table = SubjectORM.__table__  # type: ignore
+        links: Table = SubjectArticleORM.__table__  # type: ignore
+        embeddings: Table = ArticleEmbeddingORM.__table__  # type: ignore
+        articles: Table = ArticleORM.__table__  # type: ignore
+        summaries: Table = ArticleSummaryORM.__table__  # type: ignore
+        documents = sa_table(
+            ARTICLE_FTS_TABLE,
+            sa_column("url_hash"),
+            sa_column("kind"),
+            sa_column("symbol"),
+            sa_column("date"),
+        )
+        for kinds, cutoff in [
+            (ARTICLE_KINDS, policy.article_cutoff()),
+            (SUMMARY_KINDS, policy.summary_cutoff()),
+        ]:
+            if cutoff is None:
+                continue
+            report.links += self._in_batches(
+                links,
+                and_(links.c.kind.in_(kinds), links.c.date < cutoff),
+                batch_size,
+            )
+            report.embeddings += self._in_batches(
+                embeddings,
+                and_(embeddings.c.kind.in_(kinds), embeddings.c.date < cutoff),
+                batch_size,
+            )
+        summary_cutoff = policy.summary_cutoff()
+        if summary_cutoff is not None:
+            report.subjects = self._in_batches(
+                subjects,
+                and_(
+                    subjects.c.date < summary_cutoff,
+                    or_(*[subjects.c[c].is_not(None) for c in SUMMARY_COLUMNS]),
+                ),
+                batch_size,
+                values={c: null() for c in SUMMARY_COLUMNS},
+            )
+        report.articles = self._in_batches(
+            articles,
+            articles.c.url_hash.not_in(
+                sa_select(links.c.url_hash).where(links.c.kind.in_(ARTICLE_KINDS))
+            ),
+            batch_size,
+        )
+        report.summaries = self._in_batches(
+            summaries,
+            ~exists().where(
+                links.c.kind.in_(SUMMARY_KINDS),
+                links.c.url_hash == summaries.c.url_hash,
+                links.c.symbol == summaries.c.symbol,
+                links.c.date == summaries.c.date,
+            ),
+            batch_size,
+        )
+        report.documents = self._in_batches(
+            documents,
+            ~exists().where(
+                links.c.url_hash == documents.c.url_hash,
+                links.c.kind == documents.c.kind,
+                or_(
+                    documents.c.symbol.is_(None),
+                    and_(
+                        links.c.symbol == documents.c.symbol,
+                        links.c.date == documents.c.date,
+                    ),
+                ),
+            ),
+            batch_size,
+        )
+        if vacuum:
+            report.freed_pages = self.vacuum(vacuum_pages)
+        logger.info(f"Compacted database {self.database_path}: {report}.")
+        return report
+
+    def vacuum(self, pages: int = VACUUM_PAGES, step: int = VACUUM_STEP_PAGES) -> int:
+        freed = 0
+        with self._engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            auto_vacuum = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+            if auto_vacuum != INCREMENTAL_AUTO_VACUUM:
+                logger.warning(
+                    f"Database {self.database_path} does not use incremental "
+                    "auto-vacuum, run 'tickermood compact --full-vacuum' once "
+                    "to enable it."
+                )
+                return 0
+            while freed < pages:
+                free = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+                if not free:
+                    break
+                budget = min(step, pages - freed, free)
+                # Stepping the pragma through executescript frees the whole budget.
+                connection.connection.dbapi_connection.executescript(  # type: ignore
+                    f"PRAGMA incremental_vacuum({int(budget)});"
+                )
+                freed += budget
+        return freed
+
+    def enable_incremental_vacuum(self) -> bool:
+        with self._engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as connection:
+            auto_vacuum = connection.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+            if auto_vacuum == INCREMENTAL_AUTO_VACUUM:
+                return False
+            logger.info(f"Rewriting {self.database_path} for incremental vacuum.")
+            connection.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.exec_driver_sql("VACUUM")
+            return True
+
+
+class DatabaseWriter:
+    def __init__(self, db: TickerMoodDb, batch_size: int = 100) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self._queue: queue.Queue[Optional[WriteRequest]] = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="tickermood-db-writer", daemon=True
+        )
+
+    def __enter__(self) -> "DatabaseWriter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def submit(
+        self,
+        subject: "Subject",
+        usage: Optional[List[LLMUsage]] = None,
+        embeddings: Optional[List[Dict[str, Any]]] = None,
+    ) -> "Future[None]":
+        future: Future[None] = Future()
+        self._queue.put(
+            (subject.model_copy(deep=True), usage or [], embeddings or [], future)
+        )
+        return future
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            self._write([request for request in batch if request is not None])
+
+    def _write_batch(self, batch: List["WriteRequest"]) -> None:
+        self.db.write_many([subject for subject, *_ in batch])
+        for subject, usage, *_ in batch:
+            self.db.write_usage(subject, usage)
+        self.db.write_embedding_rows([row for _, _, rows, _ in batch for row in rows])
+
+    def _write(self, batch: List["WriteRequest"]) -> None:
+        if not batch:
+            return
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logger.error(f"Failed to write {batch[0][0].symbol}: {e}")
+                batch[0][3].set_exception(e)
+                return
+            logger.warning(
+                f"Failed to write {len(batch)} subjects, retrying one by one: {e}"
+            )
+            for request in batch:
+                self._write([request])
+            return
+        for *_, future in batch:
+            future.set_result(None)
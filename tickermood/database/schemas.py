@@ -1,10 +1,21 @@
 from datetime import datetime
 from typing import Optional, List, Any
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, LargeBinary
 from sqlmodel import SQLModel, Field
 
+from tickermood.database.compression import CompressedText
+from tickermood.articles import NewsSummary, PriceTargetNews
 from tickermood.subject import Subject
+from tickermood.usage import LLMUsage
+
+
+ARTICLE_FTS_TABLE = "article_fts"
+ARTICLE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {ARTICLE_FTS_TABLE} USING fts5("
+    "url_hash UNINDEXED, kind UNINDEXED, url UNINDEXED, title, content, "
+    "symbol UNINDEXED, date UNINDEXED, tokenize='porter unicode61')"
+)
 
 
 class BaseTable(SQLModel): ...
@@ -19,3 +30,47 @@ class SubjectORM(BaseTable, Subject, table=True):
     news_summary: Optional[List[Any]] = Field(default=None, sa_column=Column(JSON))  # type: ignore
     summary: Optional[List[Any]] = Field(default=None, sa_column=Column(JSON))  # type: ignore
     price_target_news: Optional[List[Any]] = Field(default=None, sa_column=Column(JSON))  # type: ignore
+
+
+class LLMUsageORM(BaseTable, LLMUsage, table=True):
+    __tablename__ = "llm_usage"
+    date: datetime = Field(primary_key=True, index=True)
+    symbol: str = Field(primary_key=True, index=True)
+    node: str = Field(primary_key=True)
+    model_name: str = Field(primary_key=True, index=True)
+
+
+class ArticleEmbeddingORM(BaseTable, table=True):
+    __tablename__ = "article_embedding"
+    url: str = Field(primary_key=True)
+    kind: str = Field(primary_key=True)
+    model_name: str = Field(primary_key=True)
+    symbol: str = Field(index=True)
+    date: datetime = Field(index=True)
+    dimension: int
+    vector: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+
+class ArticleORM(BaseTable, PriceTargetNews, table=True):
+    __tablename__ = "article"
+    url_hash: str = Field(primary_key=True)
+    url: Optional[str] = Field(default=None, index=True)
+    content: str = Field(sa_column=Column(CompressedText, nullable=False))
+
+
+class ArticleSummaryORM(BaseTable, NewsSummary, table=True):
+    __tablename__ = "article_summary"
+    url_hash: str = Field(primary_key=True)
+    symbol: str = Field(primary_key=True)
+    date: datetime = Field(primary_key=True)
+    url: Optional[str] = Field(default=None, index=True)
+    content: str = Field(sa_column=Column(CompressedText, nullable=False))
+
+
+class SubjectArticleORM(BaseTable, table=True):
+    __tablename__ = "subject_article"
+    date: datetime = Field(primary_key=True)
+    symbol: str = Field(primary_key=True)
+    kind: str = Field(primary_key=True)
+    url_hash: str = Field(primary_key=True, index=True)
+    position: int
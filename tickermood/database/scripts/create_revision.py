@@ -1,9 +1,11 @@
 import os
+import re
 from pathlib import Path
 
 from alembic import command
 from alembic.config import Config
 
+import tickermood.database.settings
 from tickermood.database.settings import DATABASE_URL
 
 
@@ -12,7 +14,21 @@ def create_revision(database_url: str, message: str) -> None:
     root_folder = Path(__file__).parents[1]
     alembic_cfg = Config(root_folder / "alembic" / "alembic.ini")
     alembic_cfg.set_main_option("script_location", str(root_folder / "alembic"))
-    command.revision(alembic_cfg, message=message, autogenerate=True)
+    script = command.revision(alembic_cfg, message=message, autogenerate=True)
+    if script is not None and not isinstance(script, list):
+        update_head_revision(script.revision)
+
+
+def update_head_revision(revision: str) -> None:
+    settings = Path(tickermood.database.settings.__file__)
+    settings.write_text(
+        re.sub(
+            r'^HEAD_REVISION = ".*"$',
+            f'HEAD_REVISION = "{revision}"',
+            settings.read_text(),
+            flags=re.MULTILINE,
+        )
+    )
 
 
 if __name__ == "__main__":
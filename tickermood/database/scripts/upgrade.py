@@ -1,26 +1,61 @@
+import logging
 import os
 from pathlib import Path
 from typing import Optional
 
-from alembic import command
-from alembic.config import Config
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
 
 
-from tickermood.database.settings import DATABASE_URL
+from tickermood.database.settings import DATABASE_URL, HEAD_REVISION
+
+logger = logging.getLogger(__name__)
+
+
+def current_revision(database_url: str) -> Optional[str]:
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as connection:
+            return connection.execute(
+                text("SELECT version_num FROM alembic_version")
+            ).scalar()
+    except OperationalError:
+        return None
+    finally:
+        engine.dispose()
 
 
 def upgrade(database_url: str, no_migration: Optional[bool] = False) -> None:
-    root_folder = Path(__file__).parents[1]
-    os.environ.update({"DATABASE_URL": database_url})
-    alembic_cfg = Config(root_folder / "alembic" / "alembic.ini")
-    alembic_cfg.set_main_option("script_location", str(root_folder / "alembic"))
     if no_migration:
-        from tickermood.database.schemas import SubjectORM
+        from tickermood.database.schemas import (
+            SubjectORM,
+            LLMUsageORM,
+            ArticleEmbeddingORM,
+            ArticleORM,
+            ArticleSummaryORM,
+            SubjectArticleORM,
+            ARTICLE_FTS_DDL,
+        )
 
         engine = create_engine(database_url, echo=True)
         SubjectORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        LLMUsageORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        ArticleEmbeddingORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        ArticleORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        ArticleSummaryORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        SubjectArticleORM.__table__.create(engine, checkfirst=True)  # type: ignore
+        with engine.begin() as connection:
+            connection.exec_driver_sql(ARTICLE_FTS_DDL)
+    elif current_revision(database_url) == HEAD_REVISION:
+        logger.debug(f"Database {database_url} is at head revision {HEAD_REVISION}.")
     else:
+        from alembic import command
+        from alembic.config import Config
+
+        root_folder = Path(__file__).parents[1]
+        os.environ.update({"DATABASE_URL": database_url})
+        alembic_cfg = Config(root_folder / "alembic" / "alembic.ini")
+        alembic_cfg.set_main_option("script_location", str(root_folder / "alembic"))
         command.upgrade(alembic_cfg, "head")
 
 
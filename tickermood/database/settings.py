@@ -2,3 +2,4 @@ from pathlib import Path
 
 DATABASE_PATH = Path(__file__).parent / "tickermood.db"
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+HEAD_REVISION = "c41d7b2e9a05"
@@ -0,0 +1,61 @@
+import logging
+from datetime import datetime
+from typing import List, Literal, Sequence
+
+import numpy as np
+import ollama
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+EMBEDDING_MODEL = "nomic-embed-text"
+EMBEDDING_BATCH_SIZE = 32
+EmbeddingKind = Literal["news", "news_summary"]
+
+
+class EmbeddingMatch(BaseModel):
+    url: str
+    kind: EmbeddingKind
+    symbol: str
+    date: datetime
+    score: float
+
+
+def embed_texts(
+    texts: Sequence[str],
+    model_name: str = EMBEDDING_MODEL,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+) -> NDArray[np.float32]:
+    vectors: List[Sequence[float]] = []
+    for start in range(0, len(texts), batch_size):
+        response = ollama.embed(
+            model=model_name, input=list(texts[start : start + batch_size])
+        )
+        vectors.extend(response.embeddings)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def to_blob(vector: NDArray[np.float32]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def from_blobs(blobs: Sequence[bytes], dimension: int) -> NDArray[np.float32]:
+    return np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(-1, dimension)
+
+
+def normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    normalized: NDArray[np.float32] = vectors / np.where(norms == 0, 1, norms)
+    return normalized
+
+
+def top_k(
+    query: NDArray[np.float32], matrix: NDArray[np.float32], k: int
+) -> List[tuple[int, float]]:
+    if not len(matrix):
+        return []
+    scores = normalize(matrix) @ normalize(query)
+    k = min(k, len(scores))
+    indices = np.argpartition(-scores, k - 1)[:k]
+    indices = indices[np.argsort(-scores[indices])]
+    return [(int(i), float(scores[i])) for i in indices]
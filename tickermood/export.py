@@ -0,0 +1,79 @@
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+
+from tickermood.types import ExportFormat
+
+logger = logging.getLogger(__name__)
+EXPORT_CHUNK_SIZE = 10_000
+SCALAR_COLUMNS = {
+    "symbol": "string",
+    "date": "timestamp",
+    "consensus": "string",
+    "recommendation": "string",
+    "high_price_target": "float",
+    "low_price_target": "float",
+    "fair_value": "float",
+}
+TEXT_COLUMNS = {
+    "summary": "string",
+    "reason": "string",
+    "explanation": "string",
+    "summary_price_target": "string",
+}
+EXPORT_SUFFIXES: Dict[str, ExportFormat] = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+
+
+def export_columns(include_text: bool = False) -> Dict[str, str]:
+    return SCALAR_COLUMNS | (TEXT_COLUMNS if include_text else {})
+
+
+def export_format(path: Path) -> ExportFormat:
+    try:
+        return EXPORT_SUFFIXES[path.suffix.lower()]
+    except KeyError as e:
+        raise ValueError(
+            f"Cannot infer export format from {path.name}, "
+            f"use one of {', '.join(EXPORT_SUFFIXES)}."
+        ) from e
+
+
+def write_frames(
+    frames: Iterator[pd.DataFrame],
+    path: Path,
+    format: Optional[ExportFormat] = None,
+    include_text: bool = False,
+) -> int:
+    import pyarrow as pa  # type: ignore[import-untyped]
+    import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+    format = format or export_format(path)
+    types = {
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "float": pa.float64(),
+    }
+    schema = pa.schema(
+        [(name, types[kind]) for name, kind in export_columns(include_text).items()]
+    )
+    writer = (
+        pq.ParquetWriter(path, schema, compression="zstd")
+        if format == "parquet"
+        else pa.ipc.new_file(path, schema)
+    )
+    rows = 0
+    with writer:
+        for frame in frames:
+            writer.write_table(
+                pa.Table.from_pandas(frame, schema=schema, preserve_index=False)
+            )
+            rows += len(frame)
+    logger.info(f"Exported {rows} rows to {path} ({format}).")
+    return rows
@@ -1,28 +1,79 @@
+import asyncio
 import logging
 import os
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Type, Annotated, Optional
+from typing import (
+    get_args,
+    Any,
+    AsyncGenerator,
+    Dict,
+    Generator,
+    List,
+    Set,
+    Type,
+    Annotated,
+    Optional,
+)
 
+import click
 import typer
 from dotenv import load_dotenv
+from typer.core import TyperGroup
 from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from pydantic import BaseModel, Field, PrivateAttr
 from rich.console import Console
+from rich.table import Table
 
-from tickermood.agent import invoke_summarize_agent
+from tickermood.database.crud import DatabaseWriter, TickerMoodDb
+from tickermood.agent import (
+    invoke_summarize_agent,
+    ainvoke_summarize_agent,
+    set_llm_semaphore,
+    sqlite_checkpointer,
+    async_sqlite_checkpointer,
+    checkpoint_thread_id,
+    completed_symbols,
+    mark_completed,
+)
 from tickermood.source import BaseSource, Investing, Yahoo, Marketwatch, StockAnalysis
+from tickermood.relevance import RELEVANCE_THRESHOLD
+from tickermood.export import EXPORT_CHUNK_SIZE
+from tickermood.retention import (
+    ARTICLE_RETENTION_DAYS,
+    COMPACTION_BATCH_SIZE,
+    SUMMARY_RETENTION_DAYS,
+    VACUUM_PAGES,
+    RetentionPolicy,
+)
 from tickermood.subject import (
     Subject,
     LLM,
     LLMSubject,
-    check_ollama_model,
-    check_openai_model,
+    is_model_available,
 )
-from tickermood.types import DatabaseConfig
+from tickermood.types import AgentNode, DatabaseConfig
+from tickermood.usage import LLMUsage, UsageCallbackHandler
 
 logger = logging.getLogger(__name__)
-app = typer.Typer()
+
+
+class DefaultCommandGroup(TyperGroup):
+    default_command = "run"
+
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        group_options = {opt for p in self.get_params(ctx) for opt in p.opts}
+        if args and args[0] not in self.commands and args[0] not in group_options:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(cls=DefaultCommandGroup)
 
 
 class TickerMoodNews(BaseModel):
@@ -32,10 +83,147 @@ class TickerMoodNews(BaseModel):
     subjects: List[Subject]
     headless: bool = True
     database_config: DatabaseConfig = Field(default_factory=DatabaseConfig)
+    run_id: str = Field(default_factory=lambda: datetime.now().strftime("%Y%m%d%H%M%S"))
+    checkpoint: bool = False
+    relevance_threshold: float = RELEVANCE_THRESHOLD
+    embedding_model: Optional[str] = None
+    max_age: Optional[timedelta] = None
+    _writer: Optional[DatabaseWriter] = PrivateAttr(default=None)
 
     def headed(self) -> None:
         self.headless = False
 
+    def resume(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.checkpoint = True
+
+    @contextmanager
+    def checkpointer(self) -> Generator[Optional[SqliteSaver], Any, None]:
+        if not self.checkpoint:
+            yield None
+            return
+        with sqlite_checkpointer(self.database_config.checkpoint_path) as saver:
+            yield saver
+
+    @asynccontextmanager
+    async def acheckpointer(self) -> AsyncGenerator[Optional[AsyncSqliteSaver], None]:
+        if not self.checkpoint:
+            yield None
+            return
+        async with async_sqlite_checkpointer(
+            self.database_config.checkpoint_path
+        ) as saver:
+            yield saver
+
+    def resumable_symbols(self) -> Set[str]:
+        if not self.checkpoint or not self.database_config.checkpoint_path.exists():
+            return set()
+        prefix = f"{self.run_id}:"
+        with self.checkpointer() as saver:
+            thread_ids = {
+                str(c.config["configurable"]["thread_id"])
+                for c in saver.list(None)  # type: ignore
+            }
+        return {t[len(prefix) :] for t in thread_ids if t.startswith(prefix)}
+
+    def completed_symbols(self) -> Set[str]:
+        if not self.checkpoint:
+            return set()
+        return completed_symbols(self.database_config.checkpoint_path, self.run_id)
+
+    def skip_completed_subjects(self) -> None:
+        completed = self.completed_symbols()
+        for symbol in sorted(completed):
+            logger.info(f"Skipping {symbol}, already completed in run {self.run_id}.")
+        self.subjects = [s for s in self.subjects if s.symbol not in completed]
+
+    def complete(self, subject: Subject) -> None:
+        if self.checkpoint:
+            mark_completed(
+                self.database_config.checkpoint_path, self.run_id, subject.symbol
+            )
+
+    def database(self) -> TickerMoodDb:
+        return TickerMoodDb(
+            database_path=self.database_config.database_path,
+            no_migration=self.database_config.no_migration,
+        )
+
+    def fresh_symbols(self) -> Set[str]:
+        if not self.max_age or not self.database_config.database_path.exists():
+            return set()
+        cutoff = datetime.now() - self.max_age
+        latest = self.database().latest_dates([s.symbol for s in self.subjects])
+        return {symbol for symbol, date in latest.items() if date >= cutoff}
+
+    def skip_fresh_subjects(self) -> None:
+        fresh_symbols = self.fresh_symbols()
+        for symbol in sorted(fresh_symbols):
+            logger.info(f"Skipping {symbol}, analysed within the last {self.max_age}.")
+        self.subjects = [s for s in self.subjects if s.symbol not in fresh_symbols]
+
+    @contextmanager
+    def database_writer(self) -> Generator[DatabaseWriter, Any, None]:
+        if self._writer is not None:
+            yield self._writer
+            return
+        with DatabaseWriter(self.database()) as writer:
+            self._writer = writer
+            try:
+                yield writer
+            finally:
+                self._writer = None
+
+    def save(
+        self, subject: Subject, usage: Optional[List[LLMUsage]] = None
+    ) -> Optional["Future[None]"]:
+        embeddings = self.embeddings(subject)
+        if self._writer is not None:
+            return self._writer.submit(subject, usage, embeddings)
+        subject.save(self.database_config)
+        if usage:
+            subject.save_usage(self.database_config, usage)
+        if embeddings:
+            self.database().write_embedding_rows(embeddings)
+        return None
+
+    def saved(self, subject: Subject, future: Optional["Future[None]"]) -> bool:
+        if future is None:
+            return True
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"Keeping checkpoint for {subject.symbol}: {e}")
+            return False
+        return True
+
+    async def asaved(self, subject: Subject, future: Optional["Future[None]"]) -> bool:
+        if future is None:
+            return True
+        try:
+            await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Keeping checkpoint for {subject.symbol}: {e}")
+            return False
+        return True
+
+    def embeddings(self, subject: Subject) -> List[Dict[str, Any]]:
+        if not self.embedding_model:
+            return []
+        try:
+            return subject.embeddings(self.database_config, self.embedding_model)
+        except Exception as e:
+            logger.warning(f"Failed to embed articles for {subject.symbol}: {e}")
+            return []
+
+    def remove_duplicate_news(self, subject: Subject) -> None:
+        if not self.embedding_model:
+            return
+        try:
+            subject.remove_duplicate_news(self.database_config, self.embedding_model)
+        except Exception as e:
+            logger.warning(f"Failed to deduplicate articles for {subject.symbol}: {e}")
+
     def set_database(self, database_config: Optional[DatabaseConfig] = None) -> None:
         if database_config:
             self.database_config = database_config
@@ -45,24 +233,70 @@ class TickerMoodNews(BaseModel):
         subjects = [Subject(symbol=symbol) for symbol in symbols]
         return cls(subjects=subjects)
 
-    def summarize(self, subject: Subject, llm: LLM) -> None:
+    def summarize(
+        self,
+        subject: Subject,
+        llm: LLM,
+        checkpointer: Optional[SqliteSaver] = None,
+    ) -> None:
+        llm_subject = LLMSubject.from_subject(subject, llm)
+        usage = UsageCallbackHandler()
+        thread_id = checkpoint_thread_id(self.run_id, subject)
+        summarized_subject = invoke_summarize_agent(
+            llm_subject,
+            callbacks=[usage],
+            checkpointer=checkpointer,
+            thread_id=thread_id,
+        )
+        saved = self.save(summarized_subject, usage.get_usage())
+        if checkpointer and self.saved(summarized_subject, saved):
+            self.complete(summarized_subject)
+            checkpointer.delete_thread(thread_id)
+
+    async def asummarize(
+        self,
+        subject: Subject,
+        llm: LLM,
+        checkpointer: Optional[AsyncSqliteSaver] = None,
+    ) -> None:
         llm_subject = LLMSubject.from_subject(subject, llm)
-        summarized_subject = invoke_summarize_agent(llm_subject)
-        summarized_subject.save(self.database_config)
+        usage = UsageCallbackHandler()
+        thread_id = checkpoint_thread_id(self.run_id, subject)
+        summarized_subject = await ainvoke_summarize_agent(
+            llm_subject,
+            callbacks=[usage],
+            checkpointer=checkpointer,
+            thread_id=thread_id,
+        )
+        saved = self.save(summarized_subject, usage.get_usage())
+        if checkpointer and await self.asaved(summarized_subject, saved):
+            self.complete(summarized_subject)
+            await checkpointer.adelete_thread(thread_id)
 
     def search(self, llm: Optional[LLM] = None) -> None:
+        if llm:
+            llm.preflight()
+        resumable_symbols = self.resumable_symbols()
         for subject in self.subjects:
+            if subject.symbol in resumable_symbols:
+                logger.info(
+                    f"Resuming {subject.symbol} from checkpoint, not searching."
+                )
+                continue
             for source in self.sources:
                 try:
                     subject = source.search_subject(  # noqa: PLW2901
-                        subject, headless=self.headless
+                        subject,
+                        headless=self.headless,
+                        relevance_threshold=self.relevance_threshold,
                     )
                 except Exception as e:  # noqa: PERF203
                     logger.warning(
                         f"Error searching for subject {subject.symbol} in {type(source).__name__}: {e}"
                     )
                     continue
-            subject.save(self.database_config)
+            self.remove_duplicate_news(subject)
+            self.save(subject)
             if llm:
                 try:
                     self.summarize(subject, llm)
@@ -81,6 +315,9 @@ class TickerMood(TickerMoodNews):
             model_name="qwen3:4b", model_type=ChatOllama, temperature=0.0
         )
     )
+    concurrency: int = Field(
+        default_factory=lambda: int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+    )
 
     @classmethod
     def from_subjects(cls, subjects: List[Subject]) -> "TickerMood":
@@ -95,15 +332,48 @@ class TickerMood(TickerMoodNews):
         self.llm = llm
 
     def run(self) -> None:
-        self.search()
-        self.call_agent()
+        self.skip_fresh_subjects()
+        self.skip_completed_subjects()
+        with self.database_writer():
+            self.search()
+            self.call_agent()
         logger.info("TickerMood run completed.")
 
     def call_agent(self) -> None:
         if self.llm is None:
             raise ValueError("LLM must be set before calling the agent.")
-        for subject in self.subjects:
-            self.summarize(subject, self.llm)
+        self.llm.preflight()
+        self.skip_completed_subjects()
+        with self.llm.loaded(), self.checkpointer() as checkpointer:
+            for subject in self.subjects:
+                self.summarize(subject, self.llm, checkpointer)
+
+    async def arun(self) -> None:
+        self.skip_fresh_subjects()
+        self.skip_completed_subjects()
+        with self.database_writer():
+            self.search()
+            await self.acall_agent()
+        logger.info("TickerMood run completed.")
+
+    async def acall_agent(self) -> None:
+        if self.llm is None:
+            raise ValueError("LLM must be set before calling the agent.")
+        self.llm.preflight()
+        self.skip_completed_subjects()
+        set_llm_semaphore(self.concurrency)
+        with self.llm.loaded():
+            async with self.acheckpointer() as checkpointer:
+                results = await asyncio.gather(
+                    *(
+                        self.asummarize(subject, self.llm, checkpointer)
+                        for subject in self.subjects
+                    ),
+                    return_exceptions=True,
+                )
+        for subject, result in zip(self.subjects, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to summarize subject {subject.symbol}: {result}")
 
 
 def get_news(
@@ -111,27 +381,76 @@ def get_news(
     database_config: DatabaseConfig,
     headless: bool = True,
     model_name: str = "gpt-4-turbo",
+    max_age: Optional[timedelta] = None,
 ) -> None:
     llm = None
     ticker_mood = TickerMoodNews.from_symbols(symbols)
     ticker_mood.set_database(database_config)
     ticker_mood.headless = headless
-    if check_openai_model(model_name):
+    ticker_mood.max_age = max_age
+    ticker_mood.skip_fresh_subjects()
+    if is_model_available(ChatOpenAI, model_name):
         llm = LLM(model_name=model_name, model_type=ChatOpenAI, temperature=0.0)
-    elif check_ollama_model(model_name):
+    elif is_model_available(ChatOllama, model_name):
         llm = LLM(model_name=model_name, model_type=ChatOllama, temperature=0.0)
     else:
         pass
-    ticker_mood.search(llm)
+    with ticker_mood.database_writer():
+        ticker_mood.search(llm)
+
+
+def parse_node_models(values: List[str]) -> Dict[AgentNode, str]:
+    node_models: Dict[AgentNode, str] = {}
+    for value in values:
+        node, _, model_name = value.partition("=")
+        if node not in get_args(AgentNode) or not model_name:
+            raise typer.BadParameter(
+                f"Invalid node model '{value}', expected node=model with node in {get_args(AgentNode)}."
+            )
+        node_models[node] = model_name  # type: ignore[index]
+    return node_models
 
 
 @app.command()
-def run(
+def run(  # noqa: C901, PLR0912, PLR0913, PLR0917
     symbols: Annotated[List[str], typer.Argument()],
     path: Optional[Path] = None,
     model: Optional[str] = None,
     headless: bool = True,
     openai_api_key_path: Optional[Path] = None,
+    skip_model_check: bool = False,
+    asynchronous: bool = False,
+    concurrency: Optional[int] = None,
+    checkpoint: bool = False,
+    resume: Optional[str] = None,
+    node_model: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Per-node model as node=model, e.g. summarize=qwen3:1.7b"),
+    ] = None,
+    relevance_threshold: Annotated[
+        float,
+        typer.Option(
+            help="Minimum article relevance score, e.g. 0.25. Disabled by default."
+        ),
+    ] = RELEVANCE_THRESHOLD,
+    compress_tokens: Annotated[
+        Optional[int],
+        typer.Option(help="Extractively compress articles to this token budget."),
+    ] = None,
+    pack_tokens: Annotated[
+        Optional[int],
+        typer.Option(
+            help="Pack short articles into one summarize call up to this budget."
+        ),
+    ] = None,
+    embedding_model: Annotated[
+        Optional[str],
+        typer.Option(help="Ollama embedding model used to index and dedupe articles."),
+    ] = None,
+    max_age: Annotated[
+        Optional[float],
+        typer.Option(help="Skip symbols analysed within this many hours."),
+    ] = None,
 ) -> None:
     ticker_mood = TickerMood.from_symbols(symbols)
     if not headless:
@@ -148,16 +467,171 @@ def run(
         if "OPENAI_API_KEY" not in os.environ:
             raise ValueError("OpenAI API key not found in environment variables.")
         model = model or "gpt-4o-mini"
-        llm = LLM(model_name=model, model_type=ChatOpenAI, temperature=0.0)
+        llm = LLM(
+            model_name=model,
+            model_type=ChatOpenAI,
+            temperature=0.0,
+            skip_validation=skip_model_check,
+        )
         ticker_mood.set_llm(llm)
     if not openai_api_key_path and model:
-        llm = LLM(model_name=model, model_type=ChatOllama, temperature=0.0)
+        llm = LLM(
+            model_name=model,
+            model_type=ChatOllama,
+            temperature=0.0,
+            skip_validation=skip_model_check,
+        )
         ticker_mood.set_llm(llm)
+    if node_model:
+        ticker_mood.llm.node_models = parse_node_models(node_model)
+    ticker_mood.relevance_threshold = relevance_threshold
+    ticker_mood.embedding_model = embedding_model
+    if max_age:
+        ticker_mood.max_age = timedelta(hours=max_age)
+    if compress_tokens:
+        ticker_mood.llm.compression_tokens = compress_tokens
+    if pack_tokens:
+        ticker_mood.llm.pack_tokens = pack_tokens
+    if concurrency:
+        ticker_mood.concurrency = concurrency
+    ticker_mood.checkpoint = checkpoint
+    if resume:
+        ticker_mood.resume(resume)
     console = Console()
+    if ticker_mood.checkpoint:
+        console.log(f"Run id: {ticker_mood.run_id} (resume with --resume)")
 
     with console.status(
         f"[bold green]Fetching and analysing articles for {', '.join(symbols)}...[/]",
         spinner="dots",
     ):
-        ticker_mood.run()
+        if asynchronous:
+            asyncio.run(ticker_mood.arun())
+        else:
+            ticker_mood.run()
         console.log("[bold green]Done![/]")
+
+
+@app.command()
+def report(
+    symbols: Annotated[Optional[List[str]], typer.Argument()] = None,
+    path: Optional[Path] = None,
+) -> None:
+    path = path or Path.cwd() / "tickermood.db"
+    usage = TickerMoodDb(database_path=path).usage_report(symbols)
+    table = Table(title="LLM usage per node and model")
+    for column in [
+        "Node",
+        "Model",
+        "Calls",
+        "Input tokens",
+        "Output tokens",
+        "Latency (s)",
+        "Avg latency (s)",
+        "Cache hits",
+    ]:
+        table.add_column(column)
+    for u in sorted(usage, key=lambda u: u.latency, reverse=True):
+        table.add_row(
+            u.node,
+            u.model_name,
+            str(u.calls),
+            str(u.input_tokens),
+            str(u.output_tokens),
+            f"{u.latency:.2f}",
+            f"{u.latency / u.calls:.2f}" if u.calls else "-",
+            str(u.cache_hits),
+        )
+    Console().print(table)
+
+
+@app.command()
+def search(  # noqa: PLR0913, PLR0917
+    query: str,
+    symbols: Annotated[Optional[List[str]], typer.Argument()] = None,
+    path: Optional[Path] = None,
+    days: Optional[int] = None,
+    limit: int = 20,
+    raw: Annotated[
+        bool, typer.Option(help="Pass the query to SQLite FTS5 unescaped.")
+    ] = False,
+) -> None:
+    path = path or Path.cwd() / "tickermood.db"
+    since = datetime.now() - timedelta(days=days) if days else None
+    hits = TickerMoodDb(database_path=path).search_text(
+        query, k=limit, symbols=symbols, since=since, raw=raw
+    )
+    table = Table(title=f"Articles matching '{query}'")
+    for column in ["Symbol", "Date", "Kind", "Title", "Snippet", "Score", "Url"]:
+        table.add_column(column)
+    for hit in hits:
+        table.add_row(
+            hit.symbol,
+            hit.date.strftime("%Y-%m-%d"),
+            hit.kind,
+            hit.title or "-",
+            hit.snippet,
+            f"{hit.score:.2f}",
+            hit.url or "-",
+        )
+    Console().print(table)
+
+
+@app.command()
+def export(  # noqa: PLR0913, PLR0917
+    output: Path,
+    symbols: Annotated[Optional[List[str]], typer.Argument()] = None,
+    path: Optional[Path] = None,
+    days: Optional[int] = None,
+    include_text: bool = False,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> None:
+    path = path or Path.cwd() / "tickermood.db"
+    since = datetime.now() - timedelta(days=days) if days else None
+    rows = TickerMoodDb(database_path=path).export(
+        output,
+        symbols=symbols,
+        since=since,
+        include_text=include_text,
+        chunk_size=chunk_size,
+    )
+    Console().log(f"[bold green]Exported {rows} rows to {output}.[/]")
+
+
+@app.command()
+def compact(  # noqa: PLR0913, PLR0917
+    path: Optional[Path] = None,
+    article_days: Optional[int] = ARTICLE_RETENTION_DAYS,
+    summary_days: Optional[int] = SUMMARY_RETENTION_DAYS,
+    keep_articles: bool = False,
+    keep_summaries: bool = False,
+    batch_size: int = COMPACTION_BATCH_SIZE,
+    vacuum: bool = True,
+    vacuum_pages: Annotated[
+        int, typer.Option(help="Maximum number of free pages to release.")
+    ] = VACUUM_PAGES,
+    full_vacuum: Annotated[
+        bool,
+        typer.Option(
+            help="Rewrite the database once to enable incremental vacuum. "
+            "Locks the database while it runs."
+        ),
+    ] = False,
+) -> None:
+    path = path or Path.cwd() / "tickermood.db"
+    policy = RetentionPolicy(
+        article_days=None if keep_articles else article_days,
+        summary_days=None if keep_summaries else summary_days,
+    )
+    db = TickerMoodDb(database_path=path)
+    if full_vacuum:
+        db.enable_incremental_vacuum()
+    report = db.compact(
+        policy, batch_size=batch_size, vacuum=vacuum, vacuum_pages=vacuum_pages
+    )
+    table = Table(title=f"Compaction of {path.name}")
+    for column in ["Removed", "Count"]:
+        table.add_column(column)
+    for name, count in report.model_dump().items():
+        table.add_row(name.replace("_", " ").capitalize(), str(count))
+    Console().print(table)
@@ -0,0 +1,130 @@
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, Field
+
+from tickermood.articles import News
+from tickermood.subject import Subject
+
+logger = logging.getLogger(__name__)
+RELEVANCE_THRESHOLD = 0.0
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+NAME_STOPWORDS = {
+    "ag",
+    "and",
+    "class",
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "group",
+    "holding",
+    "holdings",
+    "inc",
+    "incorporated",
+    "limited",
+    "ltd",
+    "nv",
+    "of",
+    "plc",
+    "sa",
+    "se",
+    "the",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def subject_terms(subject: Subject) -> List[str]:
+    terms = []
+    symbol = (subject.symbol_without_suffix or subject.symbol).lower()
+    if len(symbol) > 1:
+        terms.append(symbol)
+    if subject.name:
+        terms.extend(
+            token
+            for token in tokenize(subject.name)
+            if token not in NAME_STOPWORDS and len(token) > 1
+        )
+    return list(dict.fromkeys(terms))
+
+
+class RelevanceScore(BaseModel):
+    mentions: int = 0
+    score: float = 0.0
+
+
+def score_texts(texts: Sequence[str], terms: List[str]) -> List[RelevanceScore]:
+    counts = [Counter(tokenize(text)) for text in texts]
+    document_frequency = {
+        term: sum(1 for count in counts if count[term]) for term in terms
+    }
+    idf = {
+        term: math.log((1 + len(counts)) / (1 + document_frequency[term])) + 1
+        for term in terms
+    }
+    total_idf = sum(idf.values())
+    scores = []
+    for count in counts:
+        mentions = sum(count[term] for term in terms)
+        weight = sum(idf[term] * min(1.0, math.log1p(count[term])) for term in terms)
+        scores.append(
+            RelevanceScore(
+                mentions=mentions, score=weight / total_idf if total_idf else 0.0
+            )
+        )
+    return scores
+
+
+class RelevanceFilter(BaseModel):
+    terms: List[str] = Field(default_factory=list)
+    threshold: float = RELEVANCE_THRESHOLD
+    min_mentions: int = 1
+
+    @classmethod
+    def from_subject(
+        cls, subject: Subject, threshold: float = RELEVANCE_THRESHOLD
+    ) -> "RelevanceFilter":
+        return cls(terms=subject_terms(subject), threshold=threshold)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.terms) and self.threshold > 0
+
+    def drop_reason(self, score: RelevanceScore) -> Optional[str]:
+        if score.mentions < self.min_mentions:
+            return f"{score.mentions} mentions of {self.terms}"
+        if score.score < self.threshold:
+            return f"score {score.score:.2f} below {self.threshold:.2f}"
+        return None
+
+    def filter_links(self, links: List[Tuple[str, str]]) -> List[str]:
+        if not self.enabled:
+            return [url for url, _ in links]
+        scores = score_texts([f"{url} {text}" for url, text in links], self.terms)
+        relevant = []
+        for (url, _), score in zip(links, scores, strict=True):
+            reason = self.drop_reason(score)
+            if reason:
+                logger.info(f"Skipping link {url}: {reason}.")
+                continue
+            relevant.append(url)
+        return relevant
+
+    def filter_news(self, news: List[News]) -> List[News]:
+        if not self.enabled:
+            return news
+        scores = score_texts([f"{n.title or ''} {n.content}" for n in news], self.terms)
+        relevant = []
+        for article, score in zip(news, scores, strict=True):
+            reason = self.drop_reason(score)
+            if reason:
+                logger.info(f"Dropping article {article.url}: {reason}.")
+                continue
+            relevant.append(article)
+        return relevant
@@ -0,0 +1,42 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+ARTICLE_RETENTION_DAYS = 30
+SUMMARY_RETENTION_DAYS = 365
+COMPACTION_BATCH_SIZE = 5000
+VACUUM_PAGES = 10000
+VACUUM_STEP_PAGES = 500
+ARTICLE_KINDS = ("news", "price_target_news")
+SUMMARY_KINDS = ("news_summary",)
+SUMMARY_COLUMNS = ("summary", "reason", "explanation", "summary_price_target")
+
+
+class RetentionPolicy(BaseModel):
+    article_days: Optional[int] = ARTICLE_RETENTION_DAYS
+    summary_days: Optional[int] = SUMMARY_RETENTION_DAYS
+
+    def article_cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        return _cutoff(self.article_days, now)
+
+    def summary_cutoff(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        return _cutoff(self.summary_days, now)
+
+
+def _cutoff(days: Optional[int], now: Optional[datetime] = None) -> Optional[datetime]:
+    if days is None:
+        return None
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+class CompactionReport(BaseModel):
+    links: int = 0
+    articles: int = 0
+    summaries: int = 0
+    documents: int = 0
+    embeddings: int = 0
+    subjects: int = 0
+    freed_pages: int = 0
@@ -1,5 +1,6 @@
 import json
 import logging
+import math
 import re
 import tempfile
 import time
@@ -7,27 +8,67 @@ from abc import abstractmethod
 from contextlib import contextmanager
 from pathlib import Path
 from time import sleep
-from typing import List, Optional, Generator, Any, Callable
+from typing import Dict, List, Optional, Generator, Any, Callable
 
 import undetected_chromedriver as uc  # type: ignore[import-untyped]
 import yfinance as yf  # type: ignore[import-untyped]
 from bs4 import BeautifulSoup
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 
 from tickermood.articles import News, PriceTargetNews
+from tickermood.relevance import RELEVANCE_THRESHOLD, RelevanceFilter
 from tickermood.subject import Subject
 from tickermood.types import SourceName
 
 logger = logging.getLogger(__name__)
 PAGE_SOURCE_PATH = Path(__file__).parents[1] / "tests" / "sources"
+STOCK_ANALYSIS_TARGETS = re.compile(
+    r"average (?:price )?target of \$?(?P<average>[\d,.]+),? with a low estimate of "
+    r"\$?(?P<low>[\d,.]+) and a high estimate of \$?(?P<high>[\d,.]+)"
+)
 
 
 def clean_url(url: str) -> str:
     return re.sub(r"[^a-zA-Z0-9]", "", url)
 
 
+def to_price(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        price = float(re.sub(r"[^0-9.\-]", "", str(value)))
+    except ValueError:
+        return None
+    return price if math.isfinite(price) and price > 0 else None
+
+
+def stock_analysis_price_targets(soup: BeautifulSoup) -> Dict[str, Optional[float]]:
+    for table in soup.find_all("table"):
+        rows = [
+            [cell.get_text(strip=True) for cell in row.find_all(["th", "td"])]
+            for row in table.find_all("tr")
+        ]
+        header = next((r for r in rows if r and r[0] == "Target"), None)
+        prices = next((r for r in rows if r and r[0] == "Price"), None)
+        if header and prices and len(header) == len(prices):
+            targets = dict(zip(header, prices, strict=True))
+            return {
+                "high_price_target": to_price(targets.get("High")),
+                "low_price_target": to_price(targets.get("Low")),
+                "fair_value": to_price(targets.get("Average")),
+            }
+    match = STOCK_ANALYSIS_TARGETS.search(soup.get_text(separator=" ", strip=True))
+    if match:
+        return {
+            "fair_value": to_price(match.group("average")),
+            "low_price_target": to_price(match.group("low")),
+            "high_price_target": to_price(match.group("high")),
+        }
+    return {}
+
+
 class SavePage(BaseModel):
     url: str
     source: str
@@ -107,12 +148,21 @@ class BaseSource(BaseModel):
     url: str
     headless: bool = False
     news_limit: int = 5
+    relevance: RelevanceFilter = Field(default_factory=RelevanceFilter)
 
     @classmethod
-    def search_subject(cls, subject: Subject, headless: bool = False) -> Subject:
+    def search_subject(
+        cls,
+        subject: Subject,
+        headless: bool = False,
+        relevance_threshold: float = RELEVANCE_THRESHOLD,
+    ) -> Subject:
         source = cls.search(subject, headless=headless)
         if source:
-            subject.news.extend(source.news())
+            source.relevance = RelevanceFilter.from_subject(
+                subject, threshold=relevance_threshold
+            )
+            subject.news.extend(source.relevance.filter_news(source.news()))
             subject.price_target_news.extend(source.get_price_target_news())
         return subject
 
@@ -155,7 +205,7 @@ class Investing(BaseSource):
 
     def news(self) -> List[News]:
         news_url = f"{self.url}-news"
-        urls: List[str] = []
+        links: Dict[str, str] = {}
         articles = []
         with temporary_web_page(news_url, headless=self.headless) as soup:
             news_ = soup.find("ul", attrs={"data-test": "news-list"})
@@ -165,9 +215,10 @@ class Investing(BaseSource):
             for item in news_:
 
                 if not item.select_one(".mb-1.mt-2\\.5.flex"):  # type: ignore[union-attr]
-                    links = item.find_all("a", href=True)  # type: ignore[union-attr]
-                    urls.extend(list({a["href"] for a in links}))
-        urls = list(set(urls))  # Remove duplicates
+                    text = item.get_text(separator=" ", strip=True)
+                    for a in item.find_all("a", href=True):  # type: ignore[union-attr]
+                        links.setdefault(str(a["href"]), text)
+        urls = self.relevance.filter_links(list(links.items()))
         for url in urls[: self.news_limit]:
             try:
                 with temporary_web_page(url, headless=self.headless) as soup:
@@ -221,12 +272,15 @@ class Yahoo(BaseSource):
 
     def news(self) -> List[News]:
         ticker = yf.Ticker(self.url)
-        urls = list(
-            {
-                n.get("content", {}).get("canonicalUrl", {}).get("url", "")
-                for n in ticker.get_news()
-            }
-        )
+        links: Dict[str, str] = {}
+        for n in ticker.get_news():
+            content = n.get("content", {})
+            url = content.get("canonicalUrl", {}).get("url", "")
+            if url:
+                links.setdefault(
+                    url, f"{content.get('title', '')} {content.get('summary', '')}"
+                )
+        urls = self.relevance.filter_links(list(links.items()))
         articles = []
         for url in urls[: self.news_limit]:
             if not url:
@@ -247,11 +301,15 @@ class Yahoo(BaseSource):
 
     def get_price_target_news(self) -> List[PriceTargetNews]:
         ticker = yf.Ticker(self.url)
+        targets = ticker.get_analyst_price_targets() or {}
         return [
             PriceTargetNews(
                 url=self.url,
-                content=json.dumps(ticker.get_analyst_price_targets()),
+                content=json.dumps(targets),
                 source=self.name,
+                high_price_target=to_price(targets.get("high")),
+                low_price_target=to_price(targets.get("low")),
+                fair_value=to_price(targets.get("mean")),
             )
         ]
 
@@ -285,18 +343,15 @@ class Marketwatch(BaseSource):
 
         news_url = f"https://www.marketwatch.com/investing/stock/{self.url.lower().split('.')[0]}"
         articles = []
-        urls: List[str] = []
+        links: Dict[str, str] = {}
         with temporary_web_page(
             news_url, headless=self.headless, callback=find_cookie_banner_market_watch
         ) as soup:
-            urls.extend(
-                [
-                    str(a["href"])
-                    for a in soup.select(
-                        'div.tab__pane[data-tab-pane="Other Sources"] a.link[href]'
-                    )
-                ]
-            )
+            for a in soup.select(
+                'div.tab__pane[data-tab-pane="Other Sources"] a.link[href]'
+            ):
+                links.setdefault(str(a["href"]), a.get_text(separator=" ", strip=True))
+        urls = self.relevance.filter_links(list(links.items()))
         for url_ in urls[: self.news_limit]:
             try:
                 with temporary_web_page(url_, headless=self.headless) as soup:
@@ -343,13 +398,13 @@ class StockAnalysis(BaseSource):
         with temporary_web_page(
             news_url, headless=self.headless, callback=find_cookie_banner_stock_analysis
         ) as soup:
-            urls = list(
-                {
-                    str(a["href"])
-                    for a in soup.find_all("a", href=True)
-                    if str(a["href"]).startswith("https://www.")
-                }
-            )
+            links: Dict[str, str] = {}
+            for a in soup.find_all("a", href=True):
+                if str(a["href"]).startswith("https://www."):
+                    links.setdefault(
+                        str(a["href"]), a.get_text(separator=" ", strip=True)
+                    )
+        urls = self.relevance.filter_links(list(links.items()))
 
         for url_ in urls[: self.news_limit]:
             try:
@@ -376,6 +431,7 @@ class StockAnalysis(BaseSource):
                         url=news_url,
                         content=content,
                         source=self.name,
+                        **stock_analysis_price_targets(soup),
                     )
                 ]
         return []
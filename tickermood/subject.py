@@ -1,13 +1,36 @@
+import asyncio
+import importlib
 import logging
 import os
+import threading
+import time
 import urllib.parse
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Optional, Type
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 import ollama
 from langchain_core.language_models import BaseChatModel
 from openai import OpenAI
-from pydantic import BaseModel, Field, model_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    field_serializer,
+    field_validator,
+    model_validator,
+)
 
 from tickermood.articles import News, PriceTargetNews, NewsSummary, Summary
 from tickermood.database.crud import TickerMoodDb
@@ -15,9 +38,11 @@ from langchain_ollama import ChatOllama
 from langchain_openai import ChatOpenAI
 
 from tickermood.exceptions import InvalidLLMError
-from tickermood.types import DatabaseConfig
+from tickermood.types import AgentNode, DatabaseConfig
+from tickermood.usage import LLMUsage
 
 logger = logging.getLogger(__name__)
+MODEL_AVAILABILITY_TTL = 600.0
 
 
 class TickerSubject(BaseModel):
@@ -61,6 +86,9 @@ class NewsAnalysis(BaseModel):
     explanation: Optional[str] = None
 
 
+class Analysis(Consensus, NewsAnalysis): ...
+
+
 class Subject(TickerSubject, PriceTarget, Consensus, NewsAnalysis):
     date: Optional[datetime] = Field(default_factory=datetime.now)
     news: List[News] = Field(default_factory=list)
@@ -84,6 +112,37 @@ class Subject(TickerSubject, PriceTarget, Consensus, NewsAnalysis):
             no_migration=database_config.no_migration,
         ).write(self)
 
+    def save_usage(
+        self, database_config: DatabaseConfig, usage: List[LLMUsage]
+    ) -> None:
+        TickerMoodDb(
+            database_path=database_config.database_path,
+            no_migration=database_config.no_migration,
+        ).write_usage(self, usage)
+
+    def embeddings(
+        self, database_config: DatabaseConfig, model_name: str
+    ) -> List[Dict[str, Any]]:
+        return TickerMoodDb(
+            database_path=database_config.database_path,
+            no_migration=database_config.no_migration,
+        ).embedding_rows(self, model_name)
+
+    def save_embeddings(self, database_config: DatabaseConfig, model_name: str) -> int:
+        return TickerMoodDb(
+            database_path=database_config.database_path,
+            no_migration=database_config.no_migration,
+        ).write_embeddings(self, model_name)
+
+    def remove_duplicate_news(
+        self, database_config: DatabaseConfig, model_name: str
+    ) -> None:
+        duplicates = TickerMoodDb(
+            database_path=database_config.database_path,
+            no_migration=database_config.no_migration,
+        ).duplicates(self.news, symbols=[self.symbol], model_name=model_name)
+        self.news = [n for n in self.news if n not in duplicates]
+
     def load(self, database_config: DatabaseConfig) -> "Subject":
         db = TickerMoodDb(
             database_path=database_config.database_path,
@@ -108,7 +167,33 @@ class Subject(TickerSubject, PriceTarget, Consensus, NewsAnalysis):
         return "####\n".join(n.content for n in self.news_summary if n.content)
 
     def combined_price_target_news(self) -> str:
-        return "####\n".join(n.content for n in self.price_target_news if n.content)
+        return "####\n".join(
+            n.content for n in self.price_target_news if n.content and not n.structured
+        )
+
+    def structured_price_target(self) -> Optional[PriceTarget]:
+        structured = [n for n in self.price_target_news if n.structured]
+        if not structured:
+            return None
+        highs = [
+            n.high_price_target for n in structured if n.high_price_target is not None
+        ]
+        lows = [
+            n.low_price_target for n in structured if n.low_price_target is not None
+        ]
+        fair_values = [n.fair_value for n in structured if n.fair_value is not None]
+        price_target = PriceTarget(
+            high_price_target=max(highs, default=None),
+            low_price_target=min(lows, default=None),
+            fair_value=sum(fair_values) / len(fair_values) if fair_values else None,
+        )
+        price_target.summary_price_target = (
+            f"Analyst price targets for {self.to_name()} from "
+            f"{', '.join(n.source for n in structured)}: "
+            f"low {price_target.low_price_target}, high {price_target.high_price_target}, "
+            f"average {price_target.fair_value}."
+        )
+        return price_target
 
     def add(self, object: BaseModel) -> None:
         for field in list(object.model_fields):
@@ -122,6 +207,10 @@ class Subject(TickerSubject, PriceTarget, Consensus, NewsAnalysis):
         return data
 
 
+class SubjectSnapshot(TickerSubject, PriceTarget, Consensus, NewsAnalysis):
+    date: datetime
+
+
 def check_ollama_model(model_name: str) -> bool:
     try:
         model_list = ollama.list()
@@ -135,6 +224,16 @@ def check_ollama_model(model_name: str) -> bool:
     return True
 
 
+def load_ollama_model(model_name: str, keep_alive: Union[float, str]) -> float:
+    start = time.perf_counter()
+    ollama.generate(model=model_name, prompt="", keep_alive=keep_alive)
+    return time.perf_counter() - start
+
+
+def unload_ollama_model(model_name: str) -> None:
+    ollama.generate(model=model_name, prompt="", keep_alive=0)
+
+
 def check_openai_model(model_name: str) -> bool:
     if "OPENAI_API_KEY" not in os.environ:
         return False
@@ -144,37 +243,202 @@ def check_openai_model(model_name: str) -> bool:
     return any(model.id == model_name for model in models.data)
 
 
+_model_availability: Dict[Tuple[str, str], Tuple[float, bool]] = {}
+_model_availability_lock = threading.Lock()
+
+
+def clear_model_availability_cache() -> None:
+    with _model_availability_lock:
+        _model_availability.clear()
+
+
+def cached_model_check(
+    provider: str,
+    model_name: str,
+    check: Callable[[str], bool],
+    ttl: float = MODEL_AVAILABILITY_TTL,
+) -> bool:
+    key = (provider, model_name)
+    now = time.monotonic()
+    with _model_availability_lock:
+        cached = _model_availability.get(key)
+    if cached and now - cached[0] < ttl:
+        return cached[1]
+    available = check(model_name)
+    if available:
+        with _model_availability_lock:
+            _model_availability[key] = (now, available)
+    return available
+
+
+def is_model_available(
+    model_type: Type[BaseChatModel], model_name: str, use_cache: bool = True
+) -> bool:
+    if model_type == ChatOllama:
+        provider, check = "ollama", check_ollama_model
+    elif model_type == ChatOpenAI:
+        provider, check = "openai", check_openai_model
+    else:
+        return False
+    ttl = MODEL_AVAILABILITY_TTL if use_cache else 0.0
+    return cached_model_check(provider, model_name, check, ttl=ttl)
+
+
+def import_model_type(path: str) -> Type[BaseChatModel]:
+    module, _, name = path.rpartition(".")
+    return getattr(importlib.import_module(module), name)  # type: ignore
+
+
+def running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def get_chat_model(
+    model_type: Type[BaseChatModel],
+    model_name: str,
+    temperature: float,
+    keep_alive: Union[float, str],
+) -> BaseChatModel:
+    return _get_chat_model(
+        model_type, model_name, temperature, keep_alive, running_loop()
+    )
+
+
+@lru_cache(maxsize=32)
+def _get_chat_model(
+    model_type: Type[BaseChatModel],
+    model_name: str,
+    temperature: float,
+    keep_alive: Union[float, str],
+    loop: Optional[asyncio.AbstractEventLoop],
+) -> BaseChatModel:
+    if model_type == ChatOllama:
+        return ChatOllama(
+            model=model_name, temperature=temperature, keep_alive=keep_alive
+        )
+    return model_type(model=model_name, temperature=temperature)
+
+
 class LLM(BaseModel):
     model_type: Type[BaseChatModel]
     model_name: str
     temperature: float = 0.0
+    skip_validation: bool = False
+    max_input_tokens: int = 3000
+    compression_tokens: Optional[int] = None
+    pack_tokens: Optional[int] = None
+    keep_alive: Union[float, str] = "30m"
+    node_models: Dict[AgentNode, str] = Field(default_factory=dict)
+
+    @field_validator("model_type", mode="before")
+    @classmethod
+    def _import_model_type(cls, value: Any) -> Any:
+        return import_model_type(value) if isinstance(value, str) else value
+
+    @field_serializer("model_type")
+    def _serialize_model_type(self, model_type: Type[BaseChatModel]) -> str:
+        return f"{model_type.__module__}.{model_type.__qualname__}"
 
     @model_validator(mode="after")
     def _validator(self) -> "LLM":
-        if (self.model_type == ChatOllama and check_ollama_model(self.model_name)) or (
-            self.model_type == ChatOpenAI and check_openai_model(self.model_name)
-        ):
+        if self.skip_validation:
             return self
-        raise InvalidLLMError(
-            f"Only Ollama and OpenAI models are supported. Model {self.model_name} is not available."
+        self.preflight()
+        return self
+
+    def model_names(self) -> List[str]:
+        return list(dict.fromkeys([self.model_name, *self.node_models.values()]))
+
+    def node_model_name(self, node: Optional[AgentNode] = None) -> str:
+        if node is None:
+            return self.model_name
+        return self.node_models.get(node, self.model_name)
+
+    def preflight(self, use_cache: bool = True) -> None:
+        if self.skip_validation:
+            return
+        for model_name in self.model_names():
+            if not is_model_available(self.model_type, model_name, use_cache=use_cache):
+                raise InvalidLLMError(
+                    f"Only Ollama and OpenAI models are supported. Model {model_name} is not available."
+                )
+
+    def get_model(self, node: Optional[AgentNode] = None) -> BaseChatModel:
+        return get_chat_model(
+            self.model_type,
+            self.node_model_name(node),
+            self.temperature,
+            self.keep_alive,
         )
 
-    def get_model(self) -> BaseChatModel:
-        return self.model_type(model=self.model_name, temperature=self.temperature)
+    def warm_up(self) -> Optional[float]:
+        if self.model_type != ChatOllama:
+            return None
+        total_load_time = 0.0
+        for model_name in self.model_names():
+            try:
+                load_time = load_ollama_model(model_name, self.keep_alive)
+            except Exception as e:  # noqa: PERF203
+                logger.warning(f"Failed to preload Ollama model {model_name}: {e}")
+                continue
+            logger.info(f"Ollama model {model_name} loaded in {load_time:.2f}s.")
+            total_load_time += load_time
+        return total_load_time
+
+    def release(self) -> None:
+        if self.model_type != ChatOllama:
+            return
+        for model_name in self.model_names():
+            try:
+                unload_ollama_model(model_name)
+            except Exception as e:  # noqa: PERF203
+                logger.warning(f"Failed to unload Ollama model {model_name}: {e}")
+
+    @contextmanager
+    def loaded(self) -> Generator[Optional[float], Any, None]:
+        load_time = self.warm_up()
+        try:
+            yield load_time
+        finally:
+            self.release()
 
 
 class LLMSubject(Subject, LLM):
+    pending_news: Optional[List[int]] = None
+    pending_index: int = 0
 
     @classmethod
     def from_subject(cls, subject: Subject, llm: LLM) -> "LLMSubject":
         return cls.model_validate(subject.model_dump() | llm.model_dump())
 
+    def _pending_news(self) -> List[int]:
+        if self.pending_news is None:
+            summarized = {hash(s) for s in self.news_summary}
+            self.pending_news = [
+                i for i, n in enumerate(self.news) if hash(n) not in summarized
+            ]
+        return self.pending_news
+
+    def pending_articles(self) -> Iterator[News]:
+        pending_news = self._pending_news()
+        for i in range(self.pending_index, len(pending_news)):
+            yield self.news[pending_news[i]]
+
     def get_next_article(self) -> Optional[News]:
-        return next(
-            (
-                n
-                for n in self.news
-                if hash(n) not in {hash(s) for s in self.news_summary}
-            ),
-            None,
-        )
+        return next(self.pending_articles(), None)
+
+    def add_news_summary(self, content: str, origin: News) -> None:
+        super().add_news_summary(content, origin)
+        pending_news = self._pending_news()
+        index = self.pending_index
+        if index < len(pending_news) and hash(self.news[pending_news[index]]) == hash(
+            origin
+        ):
+            self.pending_index += 1
+        else:
+            self.pending_news = pending_news[:index] + [
+                i for i in pending_news[index:] if hash(self.news[i]) != hash(origin)
+            ]
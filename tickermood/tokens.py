@@ -0,0 +1,77 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+CHARS_PER_TOKEN = 4
+SENTENCE_SEPARATOR = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+@lru_cache(maxsize=32)
+def _get_encoding(model_name: str) -> Optional[Any]:
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(model_name)
+    except Exception:
+        logger.debug(f"No tokenizer for model {model_name}, using an estimate.")
+        return None
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    encoding = _get_encoding(model_name)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    size = max_tokens * CHARS_PER_TOKEN
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def split_text(text: str, max_tokens: int, model_name: str) -> List[str]:
+    if count_tokens(text, model_name) <= max_tokens:
+        return [text]
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in SENTENCE_SEPARATOR.split(text):
+        if not sentence.strip():
+            continue
+        tokens = count_tokens(f"{sentence} ", model_name)
+        pieces = (
+            _hard_split(sentence, max_tokens) if tokens > max_tokens else [sentence]
+        )
+        for piece in pieces:
+            piece_tokens = min(tokens, max_tokens)
+            if current and current_tokens + piece_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def group_texts(
+    texts: List[str], max_tokens: int, model_name: str, separator: str = "####\n"
+) -> List[List[str]]:
+    groups: List[List[str]] = []
+    current: List[str] = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count_tokens(separator + text, model_name)
+        if len(current) > 1 and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    return groups
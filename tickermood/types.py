@@ -4,6 +4,8 @@ from typing import Literal
 from pydantic import BaseModel, Field
 
 SourceName = Literal["Investing", "Marketwatch", "Yahoo", "StockAnalysis"]
+ExportFormat = Literal["parquet", "arrow"]
+AgentNode = Literal["summarize", "reduce", "price_target", "get_analysis"]
 ConsensusType = Literal[
     "Strong Buy", "Buy", "Cautious Buy", "Hold", "Cautious Sell", "Sell", "Strong Sell"
 ]
@@ -12,3 +14,7 @@ ConsensusType = Literal[
 class DatabaseConfig(BaseModel):
     database_path: Path = Field(default=Path.cwd() / "tickermood.db")
     no_migration: bool = False
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.database_path.with_name(f"{self.database_path.stem}_checkpoints.db")
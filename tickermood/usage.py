@@ -0,0 +1,84 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUsage(BaseModel):
+    node: str
+    model_name: str
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency: float = 0.0
+    cache_hits: int = 0
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._runs: Dict[UUID, Tuple[float, str, str]] = {}
+        self._usage: Dict[Tuple[str, str], LLMUsage] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        node = str(metadata.get("langgraph_node", "unknown"))
+        model_name = str(
+            metadata.get("ls_model_name")
+            or kwargs.get("invocation_params", {}).get("model", "unknown")
+        )
+        with self._lock:
+            self._runs[run_id] = (time.perf_counter(), node, model_name)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        start, node, model_name = run
+        input_tokens, output_tokens, cache_read = 0, 0, 0
+        for generation in (g for gs in response.generations for g in gs):
+            if not isinstance(generation, ChatGeneration):
+                continue
+            usage_metadata = getattr(generation.message, "usage_metadata", None) or {}
+            input_tokens += usage_metadata.get("input_tokens", 0)
+            output_tokens += usage_metadata.get("output_tokens", 0)
+            cache_read += usage_metadata.get("input_token_details", {}).get(
+                "cache_read", 0
+            )
+        with self._lock:
+            usage = self._usage.setdefault(
+                (node, model_name), LLMUsage(node=node, model_name=model_name)
+            )
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            usage.output_tokens += output_tokens
+            usage.latency += time.perf_counter() - start
+            usage.cache_hits += int(cache_read > 0)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def get_usage(self) -> List[LLMUsage]:
+        with self._lock:
+            return [usage.model_copy() for usage in self._usage.values()]